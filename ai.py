@@ -0,0 +1,251 @@
+import random
+import time
+from board import Board, SIGN_X, SIGN_O, win_masks
+
+WIN_SCORE = 1_000_000
+INF = WIN_SCORE * 2
+# Оценки ближе к WIN_SCORE, чем на MATE_MARGIN, — форсированный выигрыш или проигрыш
+MATE_MARGIN = 1000
+
+# Типы записей таблицы транспозиций
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """Таблица позиций по ключу Зобриста ограниченного размера.
+
+    Более глубокий результат не затирается более мелким; при переполнении вытесняется
+    самая старая запись (dict хранит порядок вставки).
+    """
+
+    def __init__(self, max_size: int = 200_000):
+        self.max_size = max_size
+        self.entries = {}
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, key: int):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, value: int, flag: int, move: int | None):
+        old = self.entries.get(key)
+        if old is not None:
+            if old[0] > depth:
+                return
+        elif len(self.entries) >= self.max_size:
+            del self.entries[next(iter(self.entries))]
+            self.evictions += 1
+        self.entries[key] = (depth, value, flag, move)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class Engine:
+    """Negamax с альфа-бета отсечением, итеративным углублением и таблицей транспозиций.
+
+    Работает на любом поле rows x cols с правилом k в ряд. На маленьких полях перебирает
+    все пустые клетки и за миллисекунды досчитывает партию до конца; на больших смотрит
+    только клетки рядом с уже стоящими фигурами и укладывается в бюджет времени на ход.
+    """
+
+    def __init__(self, rows: int = 3, cols: int = 3, win_length: int = 3, tt_size: int = 200_000,
+                 seed: int | None = None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.win_length = min(win_length, max(rows, cols))
+        self.masks, _ = win_masks(rows, cols, self.win_length)
+        rng = random.Random(seed)
+        # Ключи Зобриста: по числу на (клетку, знак)
+        self.zobrist = [{SIGN_X: rng.getrandbits(64), SIGN_O: rng.getrandbits(64)} for _ in range(self.cells)]
+        self.tt = TranspositionTable(tt_size)
+        self.history = [0] * self.cells
+        # Чем ближе к центру, тем раньше клетка в переборе
+        center_row, center_col = (rows - 1) / 2, (cols - 1) / 2
+        self.centrality = [-int(2 * max(abs(i // cols - center_row), abs(i % cols - center_col)))
+                           for i in range(self.cells)]
+        self.full_mask = (1 << self.cells) - 1
+        self.not_first_col = sum(1 << i for i in range(self.cells) if i % cols != 0)
+        self.not_last_col = sum(1 << i for i in range(self.cells) if i % cols != cols - 1)
+        # Вес линии по числу своих фигур в ней (в линии нет фигур соперника)
+        self.weights = [0] + [10 ** n for n in range(self.win_length)]
+        # На маленьких полях смотрим все пустые клетки, на больших — только соседние с фигурами
+        self.local_moves = self.cells > 16
+        self.nodes = 0
+        self.deadline = 0.0
+
+    def hash(self, board: Board) -> int:
+        key = 0
+        for index in range(self.cells):
+            sign = board.get(index // self.cols, index % self.cols)
+            if sign is not None:
+                key ^= self.zobrist[index][sign]
+        return key
+
+    def choose_move(self, board: Board, budget_ms: float = 200) -> tuple[int, int] | None:
+        """Лучший ход для стороны, чья очередь, найденный за budget_ms миллисекунд."""
+        if board.winner() is not None or board.is_full():
+            return None
+        board = board.copy()
+        sign = board.turn()
+        other = SIGN_O if sign == SIGN_X else SIGN_X
+        if board.x | board.o == 0:
+            return divmod(max(range(self.cells), key=lambda i: self.centrality[i]), self.cols)
+        moves = self.ordered_moves(board, None)
+
+        # Выигрыш в один ход и обязательная защита не требуют перебора
+        for threat_sign in (sign, other):
+            for index in moves:
+                board.apply_index(index, threat_sign)
+                wins = board.winner() == threat_sign
+                board.undo()
+                if wins:
+                    return divmod(index, self.cols)
+
+        self.deadline = time.perf_counter() + budget_ms / 1000
+        self.nodes = 0
+        self.history = [value // 2 for value in self.history]
+        key = self.hash(board)
+        best_move = moves[0]
+        for depth in range(1, self.cells - board.count_x - board.count_o + 1):
+            try:
+                value, move = self.search_root(board, depth, moves, key)
+            except SearchTimeout:
+                break
+            best_move = move
+            # Лучший ход предыдущей итерации перебираем первым
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(value) >= WIN_SCORE - MATE_MARGIN:
+                break
+        return divmod(best_move, self.cols)
+
+    def search_root(self, board: Board, depth: int, moves: list[int], key: int) -> tuple[int, int]:
+        sign = board.turn()
+        alpha = -INF
+        best_value, best_move = -INF, moves[0]
+        for index in moves:
+            board.apply_index(index, sign)
+            value = -self.negamax(board, depth - 1, -INF, -alpha, 1, key ^ self.zobrist[index][sign])
+            board.undo()
+            if value > best_value:
+                best_value, best_move = value, index
+                alpha = max(alpha, value)
+        return best_value, best_move
+
+    def negamax(self, board: Board, depth: int, alpha: int, beta: int, ply: int, key: int) -> int:
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if board.winner_sign is not None:
+            # Выиграл предыдущий ход, то есть соперник; поражение попозже лучше, чем сразу
+            return -(WIN_SCORE - ply)
+        if board.is_full():
+            return 0
+        if depth == 0:
+            return self.evaluate(board)
+
+        alpha_orig = alpha
+        tt_move = None
+        entry = self.tt.get(key)
+        if entry is not None:
+            entry_depth, value, flag, tt_move = entry
+            if entry_depth >= depth:
+                value = self.from_tt(value, ply)
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        sign = board.turn()
+        best_value, best_move = -INF, None
+        for index in self.ordered_moves(board, tt_move):
+            board.apply_index(index, sign)
+            value = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1, key ^ self.zobrist[index][sign])
+            board.undo()
+            if value > best_value:
+                best_value, best_move = value, index
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self.history[index] += depth * depth
+                        break
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, self.to_tt(best_value, ply), flag, best_move)
+        return best_value
+
+    def to_tt(self, value: int, ply: int) -> int:
+        # Оценки выигрыша храним относительно текущей позиции, а не корня поиска
+        if value >= WIN_SCORE - MATE_MARGIN:
+            return value + ply
+        if value <= -WIN_SCORE + MATE_MARGIN:
+            return value - ply
+        return value
+
+    def from_tt(self, value: int, ply: int) -> int:
+        if value >= WIN_SCORE - MATE_MARGIN:
+            return value - ply
+        if value <= -WIN_SCORE + MATE_MARGIN:
+            return value + ply
+        return value
+
+    def candidates(self, board: Board) -> int:
+        occupied = board.x | board.o
+        free = ~occupied & self.full_mask
+        if not self.local_moves:
+            return free
+        near = self.dilate(self.dilate(occupied))
+        # Если рядом с фигурами всё занято, остаются дальние клетки
+        return near & free or free
+
+    def dilate(self, bits: int) -> int:
+        """Сдвигами расширяет множество клеток на одну во все восемь сторон."""
+        bits |= ((bits << 1) & self.not_first_col) | ((bits >> 1) & self.not_last_col)
+        bits |= (bits << self.cols) | (bits >> self.cols)
+        return bits & self.full_mask
+
+    def ordered_moves(self, board: Board, tt_move: int | None) -> list[int]:
+        moves = []
+        bits = self.candidates(board)
+        while bits:
+            low = bits & -bits
+            moves.append(low.bit_length() - 1)
+            bits ^= low
+        history, centrality = self.history, self.centrality
+        moves.sort(key=lambda index: history[index] + centrality[index], reverse=True)
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def evaluate(self, board: Board) -> int:
+        """Оценка для стороны, чья очередь: сумма весов линий, где есть фигуры только одного игрока."""
+        x, o, weights = board.x, board.o, self.weights
+        score = 0
+        for mask in self.masks:
+            in_x = x & mask
+            in_o = o & mask
+            if in_x:
+                if not in_o:
+                    score += weights[in_x.bit_count()]
+            elif in_o:
+                score -= weights[in_o.bit_count()]
+        return score if board.turn() == SIGN_X else -score
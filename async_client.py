@@ -0,0 +1,473 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+from collections import deque
+from urllib.parse import urlencode, urlsplit
+from http_client import BATCH_SIZE, GameInfoError, GameSyncMixin, decode_batch_entry, payload_error
+from models import User, Game, Player, Move, GamePayload, decode_game_payload, decode_players
+from transport import DEFAULT_TIMEOUT, ENDPOINT_TIMEOUTS, IDEMPOTENT_ENDPOINTS, RETRY_STATUS_CODES
+from updates import AdaptivePollChannel
+
+
+class AsyncResponse:
+    def __init__(self, status_code: int, headers: dict, body: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class AsyncConnectionPool:
+    """Keep-alive соединения HTTP/1.1 поверх asyncio; не больше size запросов одновременно.
+
+    Пул привязан к циклу событий, в котором им впервые воспользовались.
+    """
+
+    def __init__(self, host: str, port: int, size: int = 16, use_ssl: bool = False):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.use_ssl = use_ssl
+        self._idle = deque()
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+        self.requests = 0
+
+    async def request(self, path: str, headers: dict | None = None,
+                      timeout: tuple[float, float] = DEFAULT_TIMEOUT) -> AsyncResponse:
+        connect_timeout, read_timeout = timeout
+        async with self._slots:
+            while True:
+                reused = len(self._idle) > 0
+                if reused:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port, ssl=self.use_ssl or None), connect_timeout)
+                    self.connections_opened += 1
+                try:
+                    response, keep_alive = await asyncio.wait_for(
+                        self._exchange(reader, writer, path, headers), read_timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        # Сервер закрыл простаивавшее соединение — повторяем на новом
+                        continue
+                    raise
+                except BaseException:
+                    # В том числе отмена: состояние соединения неизвестно, в пул его возвращать нельзя
+                    writer.close()
+                    raise
+                self.requests += 1
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def _exchange(self, reader, writer, path: str, headers: dict | None) -> tuple[AsyncResponse, bool]:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept: application/json",
+                 "Connection: keep-alive"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("соединение закрыто сервером")
+        status_code = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            body = await reader.readexactly(int(response_headers["content-length"]))
+        elif status_code in (204, 304):
+            body = b""
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return AsyncResponse(status_code, response_headers, body), keep_alive
+
+    async def _read_chunked(self, reader) -> bytes:
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                # Пропускаем trailer-заголовки до пустой строки
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_idle": len(self._idle),
+            "pool_size": self.size,
+        }
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def make_connection_pool(host: str, size: int = 16) -> AsyncConnectionPool:
+    url = urlsplit(host)
+    use_ssl = url.scheme == "https"
+    return AsyncConnectionPool(url.hostname, url.port or (443 if use_ssl else 80), size, use_ssl)
+
+
+class AsyncHttpClient(GameSyncMixin):
+    """Корутинный аналог HttpClient: те же методы, те же объекты models.
+
+    Состояние синхронизации игр у каждого клиента своё, а пул соединений можно передать
+    один на всех: так сотни ботов в одном процессе делят несколько keep-alive соединений.
+    """
+
+    def __init__(self, host: str = "http://localhost:8000", pool: AsyncConnectionPool | None = None,
+                 pool_size: int = 16, max_retries: int = 2, backoff_base: float = 0.1, backoff_max: float = 2.0,
+                 timeouts: dict | None = None):
+        super().__init__()
+        self.host = host
+        if pool is None:
+            pool = make_connection_pool(host, pool_size)
+        self.pool = pool
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts is not None:
+            self.timeouts.update(timeouts)
+        self.retries = 0
+        self.batch_supported = True
+
+    async def request(self, endpoint: str, params: dict, headers: dict | None = None) -> AsyncResponse:
+        path = f"/{endpoint}?{urlencode(params)}"
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        attempts = 1 + (self.max_retries if endpoint in IDEMPOTENT_ENDPOINTS else 0)
+        for attempt in range(attempts):
+            try:
+                response = await self.pool.request(path, headers, timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                if attempt + 1 == attempts:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt + 1 == attempts:
+                    return response
+            self.retries += 1
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    async def get(self, endpoint: str, params: dict) -> dict:
+        return (await self.request(endpoint, params)).json()
+
+    async def get_user(self, user_id: str) -> User | None:
+        try:
+            # Имитация ответа сервера для локального запуска, как в HttpClient
+            return User(
+                user_id=user_id,
+                tg_id=12345,
+                username="TestUser"
+            )
+        except Exception as e:
+            logging.error(f"Исключение при получении пользователя: {e}")
+            return None
+
+    async def get_active_game_by_user_id(self, user_id: str) -> tuple[Game, list[Player], list[Move]] | None:
+        try:
+            payload = decode_game_payload((await self.request("get_active_game_by_user_id", {"user_id": user_id})).body)
+            if payload.status != 200:
+                return None
+            return self.accept_game_info(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при получении активной игры: {e}")
+            return None
+
+    async def get_game_info(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
+        try:
+            payload = decode_game_payload((await self.request("get_game_info", {"game_id": game_id})).body)
+            if payload.status != 200:
+                return None
+            return self.accept_game_info(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при получении информации об игре: {e}")
+            return None
+
+    async def get_game_updates(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
+        try:
+            params, headers = self.updates_request(game_id)
+            http_response = await self.request("get_game_info", params, headers)
+            if http_response.status_code == 304 and game_id in self.game_syncs:
+                return self.unchanged_updates(game_id)
+            payload = decode_game_payload(http_response.body, self.sync_point(game_id)[0])
+            if payload.status != 200:
+                return None
+            return self.accept_updates(game_id, payload, http_response.headers.get("etag"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при получении обновлений игры: {e}")
+            return None
+
+    async def get_games_info(self, game_ids) -> dict[int, tuple[Game, list[Player], list[Move]] | GameInfoError]:
+        """Как HttpClient.get_games_info, но пакеты (или игры по одной) запрашиваются одновременно.
+
+        Одновременных запросов не больше размера пула соединений. Кэша ответов у асинхронного
+        клиента нет, а game_syncs не трогаются.
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        payloads = {}
+        if self.batch_supported:
+            chunks = [game_ids[i:i + BATCH_SIZE] for i in range(0, len(game_ids), BATCH_SIZE)]
+            for result in await asyncio.gather(*map(self.fetch_games_batch, chunks)):
+                if result is not None:
+                    payloads.update(result)
+        missing = [game_id for game_id in game_ids if game_id not in payloads]
+        for game_id, payload in zip(missing, await asyncio.gather(*map(self.fetch_game_payload, missing))):
+            payloads[game_id] = payload
+
+        results = {}
+        for game_id in game_ids:
+            payload = payloads[game_id]
+            if isinstance(payload, GameInfoError):
+                results[game_id] = payload
+            elif payload.status != 200:
+                results[game_id] = payload_error(game_id, payload)
+            else:
+                results[game_id] = payload.game, payload.players, payload.moves
+        return results
+
+    async def fetch_games_batch(self, game_ids: list[int]) -> dict[int, GamePayload | GameInfoError] | None:
+        """Один запрос get_games_info; None, если сервер такого эндпоинта не знает."""
+        try:
+            http_response = await self.request("get_games_info", {"game_ids": ",".join(map(str, game_ids))})
+            if http_response.status_code == 404:
+                logging.info("Сервер не поддерживает get_games_info, игры запрашиваются по одной")
+                self.batch_supported = False
+                return None
+            response = http_response.json()
+            if response["status"] != 200:
+                error = response["body"].get("error", f"status {response['status']}")
+                return {game_id: GameInfoError(game_id, response["status"], error) for game_id in game_ids}
+            payloads = {}
+            for entry in response["body"]["games"]:
+                game_id = int(entry["game_id"])
+                try:
+                    payloads[game_id] = decode_batch_entry(entry)
+                except Exception as e:
+                    payloads[game_id] = GameInfoError(game_id, entry.get("status"), f"ошибка разбора ответа: {e}")
+            for game_id in game_ids:
+                if game_id not in payloads:
+                    payloads[game_id] = GameInfoError(game_id, None, "игры нет в ответе сервера")
+            return payloads
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при пакетном получении игр: {e}")
+            return {game_id: GameInfoError(game_id, None, str(e)) for game_id in game_ids}
+
+    async def fetch_game_payload(self, game_id: int) -> GamePayload | GameInfoError:
+        try:
+            return decode_game_payload((await self.request("get_game_info", {"game_id": game_id})).body)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при получении информации об игре: {e}")
+            return GameInfoError(game_id, None, str(e))
+
+    async def join_game(self, user_id: str) -> tuple[Game, list[Player]] | None:
+        try:
+            response = await self.get("join_game", {"user_id": user_id})
+            if response["status"] != 200:
+                return None
+            game = Game.from_dict(response["body"]["game"])
+            users = decode_players(response["body"]["users"])
+            return game, users
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при присоединении к игре: {e}")
+            return None
+
+    async def leave_game(self, user_id: str, game_id: str) -> bool:
+        try:
+            response = await self.get("leave_game", {"user_id": user_id, "game_id": game_id})
+            return response["status"] == 200
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при выходе из игры: {e}")
+            return False
+
+    async def make_move(self, user_id: str, game_id: int, row: int, col: int, sign: str) -> Move | None:
+        try:
+            params = {"user_id": user_id, "game_id": game_id, "row": row, "col": col, "sign": sign}
+            response = await self.get("make_move", params)
+            if response["status"] != 200:
+                return None
+            return Move.from_dict(response["body"]["move"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Исключение при совершении хода: {e}")
+            return None
+
+    def pool_stats(self) -> dict:
+        stats = self.pool.stats()
+        stats["retries"] = self.retries
+        return stats
+
+    async def close(self):
+        await self.pool.close()
+
+
+class NetworkLoop:
+    """Один цикл событий в фоновом потоке, на котором работает вся сеть клиента (или сотен ботов)."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def submit(self, coro):
+        """Запускает корутину на цикле; возвращает concurrent.futures.Future (её можно cancel())."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro, timeout: float | None = None):
+        """Выполняет корутину и блокирующе ждёт результат — для кода вне цикла событий."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._thread.is_alive():
+            self.call(cancel_all())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+
+
+class AsyncGameNetwork:
+    """Сетевая часть GameApp на общем цикле событий вместо потоков prepare и get_info.
+
+    Решения о состояниях принимает сам GameApp (handle_* методы), здесь только запросы.
+    """
+
+    def __init__(self, app, client: AsyncHttpClient, loop: NetworkLoop, idle_interval: float = 0.25):
+        self.app = app
+        self.client = client
+        self.loop = loop
+        self.idle_interval = idle_interval
+        # Только расчёт интервала опроса; ожидание — через asyncio.Event
+        self.backoff = AdaptivePollChannel()
+        self._wake = asyncio.Event()
+        self.tasks = []
+        self.pending = []
+
+    def start(self):
+        self.loop.start()
+        self.tasks = [self.loop.submit(self.prepare()), self.loop.submit(self.poll())]
+
+    def stop(self, timeout: float = 3.0):
+        # Сначала дожидаемся отправленных запросов (например, выхода из игры), потом отменяем опрос
+        for future in self.pending:
+            try:
+                future.result(timeout)
+            except Exception as e:
+                logging.error(f"Исключение при завершении сетевого запроса: {e}")
+        self.pending = []
+        for task in self.tasks:
+            task.cancel()
+
+    async def prepare(self):
+        app = self.app
+        while app.user is None:
+            user = await self.client.get_user(app.user_id)
+            if not app.handle_user(user):
+                await asyncio.sleep(1)
+                continue
+            app.handle_active_game(await self.client.get_active_game_by_user_id(app.user.user_id))
+
+    async def poll(self):
+        app = self.app
+        while True:
+            try:
+                if not app.needs_polling():
+                    # В меню сеть не трогаем, только дешёвая проверка состояния
+                    await asyncio.sleep(self.idle_interval)
+                    continue
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.backoff.interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                self.backoff.report(await self.poll_once())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Ошибка при получении информации")
+
+    async def poll_once(self) -> bool:
+        app = self.app
+        # Игрок мог выйти в меню, пока шло ожидание: проверяем состояние по одному снимку
+        snapshot = app.snapshot
+        if not app.needs_polling(snapshot):
+            return False
+        if app.needs_join(snapshot):
+            return app.handle_joined(await self.client.join_game(app.user.user_id))
+        if snapshot.game is None:
+            return False
+        game_id = snapshot.game.game_id
+        if app.resync_requested:
+            app.resync_requested = False
+            return app.handle_game_updates(await self.client.get_game_info(game_id), snapshot=True)
+        return app.handle_game_updates(await self.client.get_game_updates(game_id))
+
+    def make_move(self, row: int, col: int, sign: str):
+        """Отправляет ход без ожидания ответа; возвращает concurrent.futures.Future с Move | None."""
+        app = self.app
+        future = self.loop.submit(self.client.make_move(app.user.user_id, app.game.game_id, row, col, sign))
+        # Ответ соперника ждём скоро: опрашиваем часто, начиная прямо сейчас
+        self.wake()
+        return future
+
+    def wake(self):
+        """Из любого потока: сбрасывает интервал опроса и прерывает текущую паузу цикла опроса."""
+        self.backoff.notify_local_move()
+        self.loop.loop.call_soon_threadsafe(self._wake.set)
+
+    def leave_game(self, game_id: int):
+        user_id = self.app.user.user_id
+        self.client.forget_game(game_id)
+        future = self.loop.submit(self.client.leave_game(user_id, game_id))
+        self.pending = [pending for pending in self.pending if not pending.done()] + [future]
+        return future
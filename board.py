@@ -0,0 +1,155 @@
+from models import SIGN_X, SIGN_O
+
+# Маски выигрышных линий зависят только от размеров поля и длины линии — считаем один раз
+_win_masks_cache = {}
+
+
+def win_masks(rows: int, cols: int, win_length: int) -> tuple[list[int], list[list[int]]]:
+    """Все выигрышные линии как битовые маски и, для каждой клетки, линии, проходящие через неё."""
+    key = (rows, cols, win_length)
+    cached = _win_masks_cache.get(key)
+    if cached is not None:
+        return cached
+    masks = []
+    for row in range(rows):
+        for col in range(cols):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row = row + d_row * (win_length - 1)
+                end_col = col + d_col * (win_length - 1)
+                if not (0 <= end_row < rows and 0 <= end_col < cols):
+                    continue
+                mask = 0
+                for step in range(win_length):
+                    mask |= 1 << ((row + d_row * step) * cols + col + d_col * step)
+                masks.append(mask)
+    cell_masks = [[mask for mask in masks if mask >> index & 1] for index in range(rows * cols)]
+    _win_masks_cache[key] = masks, cell_masks
+    return masks, cell_masks
+
+
+class Board:
+    """Поле крестиков-ноликов на двух битовых масках: бит row * cols + col — клетка занята X (или 0).
+
+    Счётчики фигур и победитель обновляются при каждом ходе, поэтому очередь хода и победа
+    проверяются за константу, а не обходом всего поля.
+    """
+
+    def __init__(self, rows: int = 3, cols: int = 3, win_length: int = 3):
+        self.rows = rows
+        self.cols = cols
+        self.win_length = min(win_length, max(rows, cols))
+        self.full_mask = (1 << (rows * cols)) - 1
+        self.masks, self.cell_masks = win_masks(rows, cols, self.win_length)
+        self.x = 0
+        self.o = 0
+        self.count_x = 0
+        self.count_o = 0
+        self.winner_sign = None
+        self.history = []  # (индекс клетки, знак, победитель до хода) — для undo
+
+    def index(self, row: int, col: int) -> int:
+        return row * self.cols + col
+
+    def get(self, row: int, col: int) -> str | None:
+        bit = 1 << (row * self.cols + col)
+        if self.x & bit:
+            return SIGN_X
+        if self.o & bit:
+            return SIGN_O
+        return None
+
+    def is_empty(self, row: int, col: int) -> bool:
+        return not (self.x | self.o) >> (row * self.cols + col) & 1
+
+    def in_bounds(self, row: int, col: int) -> bool:
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def apply(self, row: int, col: int, sign: str):
+        """Ставит знак в пустую клетку; проверка занятости — на вызывающем."""
+        self.apply_index(row * self.cols + col, sign)
+
+    def apply_index(self, index: int, sign: str):
+        bit = 1 << index
+        self.history.append((index, sign, self.winner_sign))
+        if sign == SIGN_X:
+            self.x |= bit
+            self.count_x += 1
+            bits = self.x
+        else:
+            self.o |= bit
+            self.count_o += 1
+            bits = self.o
+        if self.winner_sign is None:
+            # Победу мог дать только этот ход: проверяем лишь линии через его клетку
+            for mask in self.cell_masks[index]:
+                if bits & mask == mask:
+                    self.winner_sign = sign
+                    break
+
+    def undo(self):
+        index, sign, winner_sign = self.history.pop()
+        bit = 1 << index
+        if sign == SIGN_X:
+            self.x &= ~bit
+            self.count_x -= 1
+        else:
+            self.o &= ~bit
+            self.count_o -= 1
+        self.winner_sign = winner_sign
+
+    def place(self, row: int, col: int, sign: str):
+        """Ставит знак с перезаписью: для ходов с сервера, которые главнее локального состояния."""
+        current = self.get(row, col)
+        if current == sign:
+            return
+        if current is not None:
+            self.clear(row, col)
+        self.apply(row, col, sign)
+
+    def clear(self, row: int, col: int):
+        """Убирает знак из клетки (откат неподтверждённого хода); победитель пересчитывается заново."""
+        bit = 1 << (row * self.cols + col)
+        if self.x & bit:
+            self.x &= ~bit
+            self.count_x -= 1
+        elif self.o & bit:
+            self.o &= ~bit
+            self.count_o -= 1
+        else:
+            return
+        self.history = [entry for entry in self.history if entry[0] != row * self.cols + col]
+        self.winner_sign = self.find_winner()
+
+    def find_winner(self) -> str | None:
+        for mask in self.masks:
+            if self.x & mask == mask:
+                return SIGN_X
+            if self.o & mask == mask:
+                return SIGN_O
+        return None
+
+    def winner(self) -> str | None:
+        return self.winner_sign
+
+    def turn(self) -> str:
+        return SIGN_X if self.count_x <= self.count_o else SIGN_O
+
+    def is_full(self) -> bool:
+        return (self.x | self.o) == self.full_mask
+
+    def empty_indexes(self):
+        free = ~(self.x | self.o) & self.full_mask
+        while free:
+            low = free & -free
+            yield low.bit_length() - 1
+            free ^= low
+
+    def copy(self) -> "Board":
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.history = list(self.history)
+        return board
+
+    def __repr__(self):
+        rows = ("".join(self.get(row, col) or "." for col in range(self.cols)) for row in range(self.rows))
+        return f"Board({'/'.join(rows)})"
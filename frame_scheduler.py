@@ -0,0 +1,118 @@
+import threading
+import time
+import pygame
+
+# Пользовательское событие: разбудить цикл отрисовки из другого потока
+REDRAW_EVENT = pygame.USEREVENT + 1
+
+
+class FrameScheduler:
+    """Рисует кадр, только когда экран "грязный": после ввода, смены состояния или по таймеру.
+
+    В простое цикл блокируется в pygame.event.wait и не тратит процессор; при взаимодействии
+    частота кадров ограничена fps, как раньше. Грязными могут быть весь экран или отдельные
+    прямоугольники — тогда на дисплей выводятся только они.
+    """
+
+    def __init__(self, fps: int = 60, max_idle: float = 1.0):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.full = True
+        self.rects = []
+        self.timers = {}  # имя -> (интервал, прямоугольник или None, следующий срок)
+        self.presenting = None
+        self.wake_pending = False
+        self.frames = 0
+        self.skipped = 0
+
+    def mark_dirty(self, rect: pygame.Rect | None = None):
+        """Потокобезопасно: поток опроса сервера тоже может пометить экран."""
+        with self.lock:
+            was_clean = not self.full and not self.rects
+            if rect is None:
+                self.full = True
+            elif not self.full:
+                self.rects.append(pygame.Rect(rect))
+        if was_clean and threading.current_thread() is not threading.main_thread():
+            pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+
+    def wake(self):
+        """Будит цикл из другого потока, ничего не помечая: что перерисовать, он решит сам."""
+        if threading.current_thread() is threading.main_thread():
+            return
+        with self.lock:
+            if self.wake_pending:
+                return
+            self.wake_pending = True
+        pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+
+    def set_timer(self, name: str, interval: float | None, rect: pygame.Rect | None = None):
+        """Периодически помечает rect (или весь экран); interval=None снимает таймер."""
+        if interval is None:
+            self.timers.pop(name, None)
+            return
+        current = self.timers.get(name)
+        if current is None or current[0] != interval:
+            self.timers[name] = (interval, rect, time.monotonic() + interval)
+
+    def _fire_timers(self) -> float:
+        """Помечает просроченные таймеры и возвращает, сколько можно спать до ближайшего."""
+        now = time.monotonic()
+        sleep = self.max_idle
+        for name, (interval, rect, deadline) in list(self.timers.items()):
+            if deadline <= now:
+                self.mark_dirty(rect)
+                # Выравниваем по сетке интервала, чтобы часы не "уплывали"
+                deadline += interval * max(1, int((now - deadline) // interval) + 1)
+                self.timers[name] = (interval, rect, deadline)
+            sleep = min(sleep, deadline - now)
+        return max(0.0, sleep)
+
+    def is_dirty(self) -> bool:
+        with self.lock:
+            return self.full or bool(self.rects)
+
+    def wait_events(self) -> list:
+        """Возвращает события для обработки; если рисовать нечего, блокируется до события или таймера."""
+        timeout = self._fire_timers()
+        if self.is_dirty():
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            # timeout=0 в pygame означает "ждать вечно", поэтому не меньше 1 мс
+            event = pygame.event.wait(max(1, int(timeout * 1000)))
+            self._fire_timers()
+            self.clock.tick()
+            events = pygame.event.get() if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+        # Сбрасываем только после того, как очередь разобрана: wake() из-за кадра, который
+        # ещё рисуется, иначе не пришлёт своё событие, и новый снимок ждал бы max_idle
+        with self.lock:
+            self.wake_pending = False
+        return events
+
+    def begin_frame(self) -> pygame.Rect | None:
+        """Забирает грязные области и возвращает прямоугольник отсечения для отрисовки кадра.
+
+        None — рисовать нечего. Пометки, сделанные во время отрисовки, попадут в следующий кадр.
+        """
+        with self.lock:
+            full, rects = self.full, self.rects
+            self.full = False
+            self.rects = []
+        if not full and not rects:
+            self.skipped += 1
+            return None
+        self.presenting = None if full else rects
+        if full:
+            return pygame.display.get_surface().get_rect()
+        return rects[0].unionall(rects[1:])
+
+    def end_frame(self):
+        if self.presenting is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.presenting)
+        self.presenting = None
+        self.frames += 1
@@ -0,0 +1,413 @@
+import time
+import os
+import logging
+import traceback
+from threading import Thread, Event, RLock
+from typing import TYPE_CHECKING
+from http_client import HttpClient
+from updates import make_update_channel
+from move_pipeline import MovePipeline, PendingMove
+from metrics import metrics
+from models import User, Game, Player, Move, GameStatus
+from board import Board
+from game_state import State, GameSnapshot, initial_snapshot, next_snapshot
+from journal import GameJournal, JOURNAL_DIR
+
+if TYPE_CHECKING:
+    from async_client import AsyncConnectionPool, NetworkLoop
+    from local_client import LocalGameClient
+
+# Ядро клиента без pygame: состояние игры, конечный автомат и сеть. Его импортируют окно
+# (main.GameApp), нагрузочный тест и боты; окно только рисует снимки и передаёт ввод.
+
+# Параметры игрового поля
+BOARD_ROWS = 3
+BOARD_COLS = 3
+WIN_LENGTH = 3  # сколько знаков подряд нужно для победы
+# Канал обновлений игры: "poll" (адаптивный опрос), "long_poll" или "sse"
+UPDATE_CHANNEL = os.environ.get("TICK_CROSS_UPDATES", "poll")
+# Сетевая часть: "threads" (потоки prepare/get_info) или "asyncio" (один цикл событий)
+NETWORK_MODE = os.environ.get("TICK_CROSS_NETWORK", "threads")
+# Соперник: "human" (через сервер) или "ai" (локальный движок, сервер не нужен)
+OPPONENT = os.environ.get("TICK_CROSS_OPPONENT", "human")
+# Адрес игрового сервера
+SERVER_URL = os.environ.get("TICK_CROSS_SERVER", "http://localhost:8000")
+# Каталог журнала сыгранных партий; пустая строка отключает журнал
+JOURNAL_PATH = os.environ.get("TICK_CROSS_JOURNAL", JOURNAL_DIR)
+
+user_file_name = ".user"
+
+
+def load_user_id() -> str:
+    """Идентификатор пользователя из файла .user; если файла нет, спрашивает его в консоли.
+
+    Вызывать из главного потока до открытия окна: input() не должен блокировать сеть.
+    Пустой файл — ValueError, решение о выходе принимает вызывающий.
+    """
+    if not os.path.isfile(user_file_name):
+        logging.error(f"Файл {user_file_name} не найден. Создаю новый...")
+        user_id_input = input("Введи идентификатор пользователя: ")
+        with open(user_file_name, "w") as user_file:
+            user_file.write(user_id_input)
+
+    with open(user_file_name, "r") as user_file:
+        user_id = user_file.read().strip()
+        if user_id == "":
+            raise ValueError(f"Идентификатор пользователя не найден. Положи его в файл {user_file_name}")
+    return user_id
+
+
+def make_client() -> "HttpClient | LocalGameClient":
+    """HTTP клиент (или локальный клиент для игры с компьютером) по настройкам из окружения."""
+    if OPPONENT == "ai":
+        # Движок и правила заглушки нужны только в игре с компьютером
+        from local_client import LocalGameClient
+        return LocalGameClient(BOARD_ROWS, BOARD_COLS, WIN_LENGTH)
+    return HttpClient(SERVER_URL)
+
+
+class GameCore:
+    def __init__(self, network_loop: "NetworkLoop | None" = None, connection_pool: "AsyncConnectionPool | None" = None,
+                 client: "HttpClient | LocalGameClient | None" = None, user_id: str | None = None,
+                 journal: GameJournal | None = None):
+        # Состояние игры — неизменяемый снимок: писатели (опрос, ввод, ответы на ходы) собирают
+        # новый под state_lock и подменяют ссылку, отрисовка читает без замков
+        self.state_lock = RLock()
+        self.snapshot = initial_snapshot(Board(BOARD_ROWS, BOARD_COLS, WIN_LENGTH))
+        self.user = None
+        # Без явного идентификатора файл .user читается здесь, в потоке, создающем клиента
+        self.user_id = user_id if user_id is not None else load_user_id()
+        self.http_client = client if client is not None else make_client()
+        # С циклом событий сеть работает через AsyncGameNetwork, а не в отдельных потоках;
+        # один NetworkLoop и один пул соединений можно разделить между многими клиентами
+        self.network = None
+        if network_loop is not None and self.http_client.host is None:
+            # У локального клиента (игра с компьютером) нет сервера, к которому мог бы ходить AsyncHttpClient
+            logging.warning("Локальный клиент не работает с TICK_CROSS_NETWORK=asyncio, сеть будет в потоках")
+            network_loop = None
+        if network_loop is not None:
+            # asyncio импортируется, только если он нужен
+            from async_client import AsyncHttpClient, AsyncGameNetwork
+            async_client = AsyncHttpClient(self.http_client.host, pool=connection_pool)
+            self.network = AsyncGameNetwork(self, async_client, network_loop)
+        # Локальному клиенту long-poll и SSE не нужны: ходы компьютера видны при обычном опросе
+        transport = self.http_client.transport
+        channel = UPDATE_CHANNEL if transport is not None else "poll"
+        if self.network is not None and channel != "poll":
+            # AsyncGameNetwork умеет только адаптивный опрос; молча терять настройку нельзя
+            logging.warning(f"TICK_CROSS_UPDATES={channel} не поддерживается с TICK_CROSS_NETWORK=asyncio, "
+                            f"используется адаптивный опрос")
+            channel = "poll"
+        self.update_channel = make_update_channel(channel, transport)
+        # Будит поток get_info, когда игрок выходит из меню или загружена активная игра
+        self.poll_wakeup = Event()
+        # Ходы уходят на сервер в фоне, а на доске показываются сразу
+        self.move_pipeline = MovePipeline(self.submit_move_request, self.on_move_result)
+        # Следующий опрос запросит полный снимок игры вместо дельты (после отклонённого хода)
+        self.resync_requested = False
+        # Профилирование кадров и задержки ходов соперника (TICK_CROSS_METRICS=путь)
+        self.metrics = metrics
+        self.opponent_move_at = None  # когда опрос принёс ещё не показанный ход соперника
+        # Законченные игры дописываются в локальный журнал для повторов и статистики
+        self.journal = journal
+
+    # Поля текущего снимка — только для чтения; несколько полей сразу читайте из одного self.snapshot
+    @property
+    def current_state(self) -> int:
+        return self.snapshot.state
+
+    @property
+    def game(self) -> Game | None:
+        return self.snapshot.game
+
+    @property
+    def players(self) -> tuple[Player, ...]:
+        return self.snapshot.players
+
+    @property
+    def player(self) -> Player | None:
+        return self.snapshot.player
+
+    @property
+    def enemy(self) -> Player | None:
+        return self.snapshot.enemy
+
+    @property
+    def moves(self) -> tuple[Move, ...]:
+        return self.snapshot.moves
+
+    @property
+    def board(self) -> Board:
+        return self.snapshot.board
+
+    def publish(self, **changes) -> GameSnapshot:
+        """Публикует новый снимок одной заменой ссылки. Вызывать под state_lock."""
+        snapshot = next_snapshot(self.snapshot, self.user.user_id if self.user is not None else None, **changes)
+        self.snapshot = snapshot
+        self.wake()
+        return snapshot
+
+    def wake(self):
+        """Вызывается после каждой публикации снимка; окно будит здесь цикл отрисовки."""
+
+    def start(self):
+        """Запускает сеть: цикл событий или потоки prepare и get_info."""
+        if self.network is not None:
+            self.network.start()
+            return
+        info_thread = Thread(target=self.get_info)
+        info_thread.daemon = True
+        info_thread.start()
+        prepare_thread = Thread(target=self.prepare)
+        prepare_thread.daemon = True
+        prepare_thread.start()
+
+    def shutdown(self):
+        """Выход: покинуть незаконченную игру, остановить сеть, записать метрики и журнал."""
+        snapshot = self.snapshot
+        if snapshot.game is not None and self.user is not None and snapshot.state != State.GAME_FINISHED:
+            self.leave_current_game(snapshot.game.game_id)
+        if self.network is not None:
+            self.network.stop()
+        self.export_metrics()
+        if self.journal is not None:
+            self.journal.close()
+
+    def prepare(self):
+        while self.user is None:
+            if not self.handle_user(self.http_client.get_user(self.user_id)):
+                time.sleep(1)
+                continue
+            # Проверяем, есть ли уже активная игра
+            self.handle_active_game(self.http_client.get_active_game_by_user_id(self.user.user_id))
+
+    def handle_user(self, fetched_user: User | None) -> bool:
+        if fetched_user is None:
+            logging.error(f"Пользователь с таким идентификатором не найден. Проверьте файл {user_file_name}")
+            return False
+        self.user = fetched_user
+        logging.info(f"Пользователь успешно загружен: {self.user}")
+        return True
+
+    def handle_active_game(self, already_running_game: tuple[Game, list[Player], list[Move]] | None):
+        if already_running_game is not None:
+            game, players, moves = already_running_game
+            with self.state_lock:
+                self.update_game_info(game, players, moves, State.GAME_RUNNING)
+            self.poll_wakeup.set()
+
+    def build_board(self, game: Game | None, moves) -> Board:
+        """Новая доска по ходам сервера; ещё не подтверждённые свои ходы остаются поверх них."""
+        board = Board(BOARD_ROWS, BOARD_COLS, WIN_LENGTH)
+        for move in moves:
+            board.place(move.row, move.col, move.sign)
+        game_id = game.game_id if game is not None else None
+        for pending in self.move_pipeline.snapshot():
+            if pending.game_id == game_id and board.is_empty(pending.row, pending.col):
+                board.apply(pending.row, pending.col, pending.sign)
+        return board
+
+    def apply_moves(self, board: Board, moves):
+        for move in moves:
+            # Клетку занял ход с сервера — наш ожидающий ход в ней больше не нужно откатывать
+            self.move_pipeline.discard(move.row, move.col)
+            board.place(move.row, move.col, move.sign)
+            if self.metrics.enabled and self.opponent_move_at is None and move.user_id != self.user.user_id:
+                self.opponent_move_at = time.perf_counter()
+
+    def update_game_info(self, game: Game, players: list[Player], moves: list[Move], current_state: State):
+        self.publish(state=current_state, game=game, players=tuple(players), moves=tuple(moves),
+                     board=self.build_board(game, moves))
+
+    def apply_game_updates(self, game: Game, players: list[Player], new_moves: list[Move], current_state: State) -> bool:
+        """Накладывает новые ходы на копию доски. Ничего не публикует, если ничего не изменилось."""
+        snapshot = self.snapshot
+        players = tuple(players)
+        if new_moves and snapshot.moves:
+            # Ходы, уже попавшие в снимок (например, полным снимком), второй раз не добавляем
+            last_move_id = snapshot.moves[-1].move_id
+            new_moves = [move for move in new_moves if move.move_id > last_move_id]
+        if not new_moves and current_state == snapshot.state and game == snapshot.game and players == snapshot.players:
+            # Опрос без изменений не должен будить цикл отрисовки
+            return False
+        board, moves = snapshot.board, snapshot.moves
+        if new_moves:
+            board = board.copy()
+            self.apply_moves(board, new_moves)
+            moves = moves + tuple(new_moves)
+        self.publish(state=current_state, game=game, players=players, moves=moves, board=board)
+        return True
+
+    def play_cell(self, row: int, col: int) -> bool:
+        """Ход игрока в клетку: сразу на доску, на сервер — в фоне. False, если ход сейчас невозможен."""
+        with self.state_lock:
+            snapshot = self.snapshot
+            board = snapshot.board
+            if not snapshot.can_make_move or not board.in_bounds(row, col) or not board.is_empty(row, col):
+                return False
+            board = board.copy()
+            board.apply(row, col, snapshot.player.sign)
+            # Ход попадает в очередь до публикации: пересборка доски опросом его уже не потеряет
+            self.send_move(snapshot.game.game_id, row, col, snapshot.player.sign)
+            self.publish(board=board)
+        return True
+
+    def send_move(self, game_id: int, row: int, col: int, sign: str):
+        if self.network is not None:
+            pending = self.move_pipeline.track(game_id, row, col, sign)
+            future = self.network.make_move(row, col, sign)
+            future.add_done_callback(
+                lambda done: self.move_pipeline.resolve(pending, None if done.cancelled() or done.exception() else done.result()))
+            return
+        self.move_pipeline.submit(game_id, row, col, sign)
+
+    def submit_move_request(self, pending: PendingMove) -> Move | None:
+        return self.http_client.make_move(self.user.user_id, pending.game_id, pending.row, pending.col, pending.sign)
+
+    def on_move_result(self, pending: PendingMove, move: Move | None):
+        # Вызывается из фонового потока после ответа сервера
+        if move is None:
+            logging.warning(f"Сервер не принял ход {pending}, откатываю его")
+            with self.state_lock:
+                snapshot = self.snapshot
+                if snapshot.game is not None and snapshot.game.game_id == pending.game_id:
+                    confirmed = any(m.row == pending.row and m.col == pending.col for m in snapshot.moves)
+                    if not confirmed and snapshot.board.get(pending.row, pending.col) == pending.sign:
+                        board = snapshot.board.copy()
+                        board.clear(pending.row, pending.col)
+                        self.publish(board=board)
+                    # Возможно, мы разошлись с сервером не только в этой клетке: полный снимок
+                    # запросит поток опроса, он единственный пишет ходы и состояние синхронизации
+                    self.resync_requested = True
+        self.wake_poller()
+
+    def wake_poller(self):
+        """Следующий опрос — сразу и с минимальным интервалом: ждём ответ соперника или пересинхронизацию."""
+        if self.network is not None:
+            self.network.wake()
+        else:
+            self.update_channel.notify_local_move()
+
+    def leave_current_game(self, game_id: int):
+        if self.network is not None:
+            self.network.leave_game(game_id)
+            return
+        self.http_client.leave_game(self.user.user_id, game_id)
+        self.http_client.forget_game(game_id)
+
+    def reset_game(self):
+        game = self.snapshot.game
+        if game is not None and self.user is not None:
+            self.leave_current_game(game.game_id)
+        with self.state_lock:
+            self.move_pipeline.clear()
+            self.resync_requested = False
+            self.opponent_move_at = None
+            self.publish(state=State.MENU, game=None, players=(), moves=(),
+                         board=Board(BOARD_ROWS, BOARD_COLS, WIN_LENGTH), waiting_start_time=None)
+
+    def start_waiting(self):
+        with self.state_lock:
+            # Фиксируем время начала ожидания
+            self.publish(state=State.GAME_WAITING, waiting_start_time=time.time())
+        self.poll_wakeup.set()
+
+    def export_metrics(self):
+        if not self.metrics.enabled:
+            return
+        try:
+            path = self.metrics.export()
+            logging.info(f"Метрики записаны в {path}")
+        except Exception as e:
+            logging.error(f"Исключение при записи метрик: {e}")
+
+    def get_info(self):
+        while True:
+            try:
+                self.poll_step()
+            except Exception:
+                logging.error(f"Ошибка при получении информации: {traceback.format_exc()}")
+
+    def poll_step(self):
+        """Одна итерация потока get_info: ожидание по каналу обновлений и запрос к серверу."""
+        if not self.needs_polling():
+            # В меню и после окончания игры сервер не опрашиваем, ждём смены состояния
+            self.poll_wakeup.wait(1.0)
+            self.poll_wakeup.clear()
+            return
+        game = self.snapshot.game
+        game_id = game.game_id if game is not None else None
+        after_move_id, version = self.http_client.sync_point(game_id)
+        self.update_channel.wait(game_id, after_move_id, version)
+        self.update_channel.report(self.poll_once())
+
+    def needs_polling(self, snapshot: GameSnapshot | None = None) -> bool:
+        snapshot = snapshot if snapshot is not None else self.snapshot
+        return self.user is not None and snapshot.state in (State.GAME_WAITING, State.GAME_RUNNING)
+
+    def needs_join(self, snapshot: GameSnapshot | None = None) -> bool:
+        snapshot = snapshot if snapshot is not None else self.snapshot
+        return snapshot.state == State.GAME_WAITING and snapshot.game is None
+
+    def poll_once(self) -> bool:
+        """Один запрос к серверу в текущем состоянии. Возвращает True, если что-то изменилось."""
+        # Пока канал ждал, игрок мог выйти в меню (ESC): состояние проверяем заново по одному снимку
+        snapshot = self.snapshot
+        if not self.needs_polling(snapshot):
+            return False
+        if self.needs_join(snapshot):
+            return self.handle_joined(self.http_client.join_game(self.user.user_id))
+        if snapshot.game is None:
+            return False
+        game_id = snapshot.game.game_id
+        if self.resync_requested:
+            self.resync_requested = False
+            return self.handle_game_updates(self.http_client.get_game_info(game_id), snapshot=True)
+        return self.handle_game_updates(self.http_client.get_game_updates(game_id))
+
+    def handle_joined(self, response: tuple[Game, list[Player]] | None) -> bool:
+        if response is None:
+            return False
+        game, players = response
+        return self.handle_game_updates((game, players, []))
+
+    def handle_game_updates(self, game_info: tuple[Game, list[Player], list[Move]] | None, snapshot: bool = False) -> bool:
+        """Применяет ответ сервера: дельту ходов или, если snapshot=True, полный снимок игры."""
+        if game_info is None:
+            return False
+        game, players, moves = game_info
+        with self.state_lock:
+            current = self.snapshot
+            if current.game is not None and current.game.game_id != game.game_id:
+                # Ответ по игре, из которой игрок уже вышел
+                return False
+            if current.state == State.GAME_WAITING:
+                state = State.GAME_RUNNING if len(players) == 2 else State.GAME_WAITING
+            elif current.state == State.GAME_RUNNING:
+                state = State.GAME_RUNNING if game.status == GameStatus.ACTIVE else State.GAME_FINISHED
+            else:
+                # Игрок уже вышел из игры, пока шёл запрос
+                return False
+            if snapshot:
+                self.update_game_info(game, players, moves, state)
+                changed = True
+            else:
+                changed = self.apply_game_updates(game, players, moves, state)
+            published = self.snapshot
+        if published.state == State.GAME_FINISHED and current.state != State.GAME_FINISHED:
+            # Запись на диск — уже без замка состояния
+            self.record_finished_game(published)
+        return changed
+
+    def record_finished_game(self, snapshot: GameSnapshot):
+        if self.journal is None:
+            return
+        try:
+            self.journal.record_game(snapshot.game, list(snapshot.players), list(snapshot.moves),
+                                     BOARD_ROWS, BOARD_COLS, WIN_LENGTH)
+        except Exception as e:
+            logging.error(f"Исключение при записи игры в журнал: {e}")
+
+    def check_can_make_move(self) -> bool:
+        # Считается при публикации снимка, а не в каждом кадре
+        return self.snapshot.can_make_move
@@ -0,0 +1,53 @@
+from typing import NamedTuple
+from board import Board
+from models import Game, Player, Move, GameStatus
+
+
+# Определение состояний игры
+class State:
+    MENU = 0
+    GAME_WAITING = 1
+    GAME_RUNNING = 2
+    GAME_FINISHED = 3
+
+
+class GameSnapshot(NamedTuple):
+    """Всё состояние игры, которое видит отрисовка, одним неизменяемым объектом.
+
+    Писатели собирают новый снимок под замком и публикуют его одной заменой ссылки;
+    цикл отрисовки берёт ссылку один раз за кадр и читает без замков. Доска в
+    опубликованном снимке больше не меняется: каждое изменение идёт в её копию.
+    """
+    version: int
+    state: int
+    game: Game | None
+    players: tuple[Player, ...]
+    player: Player | None  # мы, когда в игре двое
+    enemy: Player | None  # соперник, когда в игре двое
+    moves: tuple[Move, ...]  # подтверждённые сервером ходы
+    board: Board  # ходы сервера плюс наши ещё не подтверждённые
+    can_make_move: bool
+    waiting_start_time: float | None  # время начала ожидания второго игрока
+
+
+def initial_snapshot(board: Board, version: int = 0) -> GameSnapshot:
+    return GameSnapshot(version, State.MENU, None, (), None, None, (), board, False, None)
+
+
+def next_snapshot(previous: GameSnapshot, user_id: str | None, **changes) -> GameSnapshot:
+    """Изменения поверх предыдущего снимка; производные поля пересчитываются здесь, а не в каждом кадре."""
+    snapshot = previous._replace(version=previous.version + 1, **changes)
+    state, game, players, board = snapshot.state, snapshot.game, snapshot.players, snapshot.board
+    if state == State.GAME_RUNNING and game is not None and game.status == GameStatus.FINISHED:
+        state = State.GAME_FINISHED
+    player = enemy = None
+    if len(players) == 2:
+        player = next((user for user in players if user.user_id == user_id), None)
+        enemy = next((user for user in players if user.user_id != user_id), None)
+    # Очередь хода определяется по счётчикам доски, без обхода клеток
+    can_make_move = state == State.GAME_RUNNING and player is not None and board.winner() is None \
+        and board.turn() == player.sign
+    # Таймер ожидания живёт только в состоянии ожидания
+    waiting_start_time = snapshot.waiting_start_time if state == State.GAME_WAITING else None
+    return snapshot._replace(state=state, player=player, enemy=enemy, can_make_move=can_make_move,
+                             waiting_start_time=waiting_start_time)
@@ -1,56 +1,351 @@
 import logging
-import requests  # Не забудьте импортировать requests
-from models import User, Game, Player, Move, GameStatus
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import requests
+from metrics import Metrics, metrics as default_metrics
+from models import User, Game, Player, Move, GamePayload, GameStatus, decode_game_body, decode_game_payload, decode_players
+from response_cache import ResponseCache
+from transport import Transport
+
+# Сколько секунд хранить ответы в кэше HttpClient. Профиль и законченная игра уже не меняются,
+# активная игра не кэшируется вовсе, "не найдено" хранится недолго
+USER_TTL = 600.0
+FINISHED_GAME_TTL = 3600.0
+NEGATIVE_TTL = 5.0
+
+# Сколько игр запрашивать одним get_games_info (у сервера-заглушки тот же предел) и сколько
+# одиночных get_game_info держать одновременно, если сервер пакетного эндпоинта не знает
+BATCH_SIZE = 100
+BATCH_WORKERS = 8
+
+class GameSync:
+    """Что клиент уже получил по игре: последний ход и версия заголовков игры."""
+
+    def __init__(self, game: Game, players: list[Player], last_move_id: int = 0,
+                 version: int | None = None, etag: str | None = None):
+        self.game = game
+        self.players = players
+        self.last_move_id = last_move_id
+        self.version = version
+        self.etag = etag
+
+class GameSyncMixin:
+    """Инкрементальная синхронизация игр, общая для HttpClient и AsyncHttpClient."""
 
-class HttpClient:
     def __init__(self):
-        self.host = "http://localhost:8000"
+        # Состояние синхронизации по каждой игре: game_id -> GameSync
+        self.game_syncs = {}
+
+    def decode_game_info(self, body: dict) -> tuple[Game, list[Player], list[Move]]:
+        return self.accept_game_info(decode_game_body(body))
+
+    def accept_game_info(self, payload: GamePayload) -> tuple[Game, list[Player], list[Move]]:
+        self.remember_game(payload.game, payload.players, payload.moves, payload.version)
+        return payload.game, payload.players, payload.moves
+
+    def updates_request(self, game_id: int) -> tuple[dict, dict | None]:
+        sync = self.game_syncs.get(game_id)
+        params = {"game_id": game_id}
+        headers = None
+        if sync is not None:
+            params["after_move_id"] = sync.last_move_id
+            if sync.version is not None:
+                params["version"] = sync.version
+            if sync.etag is not None:
+                headers = {"If-None-Match": sync.etag}
+        return params, headers
+
+    def unchanged_updates(self, game_id: int) -> tuple[Game, list[Player], list[Move]]:
+        sync = self.game_syncs[game_id]
+        return sync.game, sync.players, []
+
+    def decode_updates(self, game_id: int, body: dict, etag: str | None = None) -> tuple[Game, list[Player], list[Move]]:
+        return self.accept_updates(game_id, decode_game_body(body, self.sync_point(game_id)[0]), etag)
+
+    def accept_updates(self, game_id: int, payload: GamePayload, etag: str | None = None) -> tuple[Game, list[Player], list[Move]]:
+        """payload уже без ходов, полученных раньше: их отбрасывает декодер по after_move_id."""
+        sync = self.game_syncs.get(game_id)
+        if sync is not None and payload.game is None:
+            # Заголовки игры не изменились с прошлой версии
+            game, players = sync.game, sync.players
+        else:
+            game, players = payload.game, payload.players
+        version = payload.version if payload.version is not None or sync is None else sync.version
+        sync = self.remember_game(game, players, payload.moves, version)
+        sync.etag = etag
+        return game, players, payload.moves
+
+    def remember_game(self, game: Game, players: list[Player], moves: list[Move], version: int | None = None) -> GameSync:
+        sync = self.game_syncs.get(game.game_id)
+        if sync is None:
+            sync = self.game_syncs[game.game_id] = GameSync(game, players)
+        sync.game = game
+        sync.players = players
+        sync.version = version
+        if moves:
+            sync.last_move_id = max(sync.last_move_id, max(move.move_id for move in moves))
+        return sync
+
+    def sync_point(self, game_id: int | None) -> tuple[int, int | None]:
+        """Последний полученный move_id и версия заголовков игры — для каналов обновлений."""
+        sync = self.game_syncs.get(game_id)
+        if sync is None:
+            return 0, None
+        return sync.last_move_id, sync.version
+
+    def forget_game(self, game_id: int):
+        self.game_syncs.pop(game_id, None)
+
+class GameInfoError(NamedTuple):
+    """Игра из пакетного запроса, которую получить не удалось."""
+    game_id: int
+    status: int | None  # status из ответа сервера; None, если запрос не дошёл или упал
+    error: str
+
+
+def payload_error(game_id: int, payload: GamePayload) -> GameInfoError:
+    return GameInfoError(game_id, payload.status, f"сервер вернул status {payload.status}")
+
+
+def decode_batch_entry(entry: dict) -> GamePayload:
+    """Одна игра из ответа get_games_info: тот же status и body, что у get_game_info."""
+    if entry["status"] != 200:
+        return GamePayload(entry["status"], None, None, [], None)
+    return decode_game_body(entry["body"])
+
+
+def map_bounded(function, items: list, workers: int) -> list:
+    """function для каждого элемента; если элементов больше одного — в пуле не больше чем из workers потоков."""
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(function, items))
+
+
+def user_ttl(user: User | None) -> float:
+    return USER_TTL if user is not None else NEGATIVE_TTL
+
+
+def game_payload_ttl(payload: GamePayload) -> float | None:
+    if payload.status == 404:
+        return NEGATIVE_TTL
+    if payload.status == 200 and payload.game is not None and payload.game.status == GameStatus.FINISHED:
+        return FINISHED_GAME_TTL
+    return None
+
+
+class HttpClient(GameSyncMixin):
+    def __init__(self, host: str = "http://localhost:8000", transport: Transport | None = None, pool_size: int = 4,
+                 metrics: Metrics | None = None, cache_size: int = 256):
+        self.host = host
+        # Все запросы идут через одну keep-alive сессию с пулом соединений
+        self.transport = transport if transport is not None else Transport(host, pool_size=pool_size)
+        # Счётчики и время запросов по эндпоинтам; по умолчанию общие метрики процесса
+        self.metrics = metrics if metrics is not None else default_metrics
+        # Ответы, которые больше не изменятся; одинаковые одновременные запросы потоков prepare
+        # и get_info склеиваются в один
+        self.cache = ResponseCache(cache_size)
+        # Сбрасывается, если сервер ответил 404 на get_games_info
+        self.batch_supported = True
+        super().__init__()
+
+    def request(self, endpoint: str, params: dict, headers: dict | None = None) -> requests.Response:
+        """Запрос через transport; при включённых метриках замеряет время и считает исключения."""
+        if not self.metrics.enabled:
+            return self.transport.request(endpoint, params, headers)
+        start = time.perf_counter()
+        try:
+            response = self.transport.request(endpoint, params, headers)
+        except Exception:
+            self.metrics.inc("http_requests_total", {"endpoint": endpoint, "outcome": "exception"})
+            raise
+        finally:
+            self.metrics.observe("http_request_seconds", time.perf_counter() - start, {"endpoint": endpoint})
+        return response
+
+    def decode_response(self, endpoint: str, response: requests.Response, decode):
+        """decode(response); ошибка разбора (например, HTML от прокси) считается как outcome="exception"."""
+        try:
+            return decode(response)
+        except Exception:
+            self.metrics.inc("http_requests_total", {"endpoint": endpoint, "outcome": "exception"})
+            raise
+
+    def count_status(self, endpoint: str, status: int):
+        """Исход запроса по полю status в ответе сервера (HTTP-код у этого API всегда 200)."""
+        if self.metrics.enabled:
+            outcome = "ok" if status == 200 else "error"
+            self.metrics.inc("http_requests_total", {"endpoint": endpoint, "outcome": outcome})
+
+    def get(self, endpoint: str, params: dict) -> dict:
+        response = self.decode_response(endpoint, self.request(endpoint, params), requests.Response.json)
+        self.count_status(endpoint, response["status"])
+        return response
+
+    def get_game_payload(self, endpoint: str, params: dict) -> GamePayload:
+        payload = self.decode_response(endpoint, self.request(endpoint, params),
+                                       lambda response: decode_game_payload(response.content))
+        self.count_status(endpoint, payload.status)
+        return payload
 
     def get_user(self, user_id: str) -> User | None:
         try:
-            # Имитация ответа сервера для локального запуска
-            return User(
-                user_id=user_id,
-                tg_id=12345,
-                username="TestUser"
-            )
+            return self.cache.get_or_load(("get_user", user_id), lambda: self.load_user(user_id), user_ttl)
         except Exception as e:
             logging.error(f"Исключение при получении пользователя: {e}")
             return None
 
+    def load_user(self, user_id: str) -> User | None:
+        # Имитация ответа сервера для локального запуска
+        return User(
+            user_id=user_id,
+            tg_id=12345,
+            username="TestUser"
+        )
+
     def get_active_game_by_user_id(self, user_id: str) -> tuple[Game, list[Player], list[Move]] | None:
         try:
-            response = requests.get(f"{self.host}/get_active_game_by_user_id?user_id={user_id}").json()
-            if response["status"] != 200:
+            payload = self.get_game_payload("get_active_game_by_user_id", {"user_id": user_id})
+            if payload.status != 200:
                 return None
-            game = Game(**response["body"]["game"])
-            players = [Player(**user) for user in response["body"]["users"]]
-            moves = [Move(**move) for move in response["body"]["moves"]]
-            return game, players, moves
+            return self.accept_game_info(payload)
         except Exception as e:
             logging.error(f"Исключение при получении активной игры: {e}")
             return None
 
     def get_game_info(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
         try:
-            response = requests.get(f"{self.host}/get_game_info?game_id={game_id}").json()
-            if response["status"] != 200:
+            payload = self.load_game_payload(game_id)
+            if payload.status != 200:
                 return None
-            game = Game(**response["body"]["game"])
-            players = [Player(**user) for user in response["body"]["users"]]
-            moves = [Move(**move) for move in response["body"]["moves"]]
-            return game, players, moves
+            return self.accept_game_info(payload)
         except Exception as e:
             logging.error(f"Исключение при получении информации об игре: {e}")
             return None
 
+    def load_game_payload(self, game_id: int) -> GamePayload:
+        return self.cache.get_or_load(("get_game_info", game_id),
+                                      lambda: self.get_game_payload("get_game_info", {"game_id": game_id}),
+                                      game_payload_ttl)
+
+    def get_games_info(self, game_ids) -> dict[int, tuple[Game, list[Player], list[Move]] | GameInfoError]:
+        """Несколько игр сразу — для наблюдателей и панелей со множеством игр.
+
+        Законченные игры берутся из кэша, остальные — одним запросом get_games_info на каждые
+        BATCH_SIZE игр. Сервер без этого эндпоинта (404) запоминается, и игры запрашиваются
+        по одной через пул потоков. Ошибка по одной игре не мешает остальным: на её месте
+        в ответе GameInfoError.
+
+        Синхронизацию (game_syncs) не трогает: это снимки для просмотра, и дельты
+        get_game_updates по игре, в которой мы играем, от них не сдвигаются.
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        payloads = {}
+        missing = []
+        for game_id in game_ids:
+            payload = self.cache.peek(("get_game_info", game_id))
+            if payload is None:
+                missing.append(game_id)
+            else:
+                payloads[game_id] = payload
+        if missing:
+            payloads.update(self.fetch_game_payloads(missing))
+
+        results = {}
+        for game_id in game_ids:
+            payload = payloads[game_id]
+            if isinstance(payload, GameInfoError):
+                results[game_id] = payload
+            elif payload.status != 200:
+                results[game_id] = payload_error(game_id, payload)
+            else:
+                results[game_id] = payload.game, payload.players, payload.moves
+        return results
+
+    def fetch_game_payloads(self, game_ids: list[int]) -> dict[int, GamePayload | GameInfoError]:
+        workers = min(BATCH_WORKERS, self.transport.pool_size)
+        payloads = {}
+        if self.batch_supported:
+            chunks = [game_ids[i:i + BATCH_SIZE] for i in range(0, len(game_ids), BATCH_SIZE)]
+            for result in map_bounded(self.fetch_games_batch, chunks, workers):
+                if result is not None:
+                    payloads.update(result)
+        missing = [game_id for game_id in game_ids if game_id not in payloads]
+        for game_id, payload in zip(missing, map_bounded(self.fetch_game_payload, missing, workers)):
+            payloads[game_id] = payload
+        return payloads
+
+    def fetch_games_batch(self, game_ids: list[int]) -> dict[int, GamePayload | GameInfoError] | None:
+        """Один запрос get_games_info; None, если сервер такого эндпоинта не знает."""
+        try:
+            http_response = self.request("get_games_info", {"game_ids": ",".join(map(str, game_ids))})
+            if http_response.status_code == 404:
+                logging.info("Сервер не поддерживает get_games_info, игры запрашиваются по одной")
+                self.batch_supported = False
+                return None
+            response = self.decode_response("get_games_info", http_response, requests.Response.json)
+            self.count_status("get_games_info", response["status"])
+            if response["status"] != 200:
+                error = response["body"].get("error", f"status {response['status']}")
+                return {game_id: GameInfoError(game_id, response["status"], error) for game_id in game_ids}
+            payloads = {}
+            for entry in response["body"]["games"]:
+                game_id = int(entry["game_id"])
+                try:
+                    payload = decode_batch_entry(entry)
+                except Exception as e:
+                    payloads[game_id] = GameInfoError(game_id, entry.get("status"), f"ошибка разбора ответа: {e}")
+                    continue
+                self.cache.put(("get_game_info", game_id), payload, game_payload_ttl(payload))
+                payloads[game_id] = payload
+            for game_id in game_ids:
+                if game_id not in payloads:
+                    payloads[game_id] = GameInfoError(game_id, None, "игры нет в ответе сервера")
+            return payloads
+        except Exception as e:
+            logging.error(f"Исключение при пакетном получении игр: {e}")
+            return {game_id: GameInfoError(game_id, None, str(e)) for game_id in game_ids}
+
+    def fetch_game_payload(self, game_id: int) -> GamePayload | GameInfoError:
+        try:
+            return self.load_game_payload(game_id)
+        except Exception as e:
+            logging.error(f"Исключение при получении информации об игре: {e}")
+            return GameInfoError(game_id, None, str(e))
+
+    def get_game_updates(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
+        """Как get_game_info, но возвращает только ходы новее последнего полученного.
+
+        Сервер получает after_move_id и version (и If-None-Match, если был ETag) и может
+        прислать только новые ходы, а game/users опустить, если они не менялись.
+        Старый сервер, который параметры игнорирует, тоже поддерживается: лишние ходы
+        отбрасываются до декодирования.
+        """
+        try:
+            params, headers = self.updates_request(game_id)
+            http_response = self.request("get_game_info", params, headers)
+            if http_response.status_code == 304 and game_id in self.game_syncs:
+                self.count_status("get_game_info", 200)
+                return self.unchanged_updates(game_id)
+            after_move_id = self.sync_point(game_id)[0]
+            payload = self.decode_response("get_game_info", http_response,
+                                           lambda response: decode_game_payload(response.content, after_move_id))
+            self.count_status("get_game_info", payload.status)
+            if payload.status != 200:
+                return None
+            return self.accept_updates(game_id, payload, http_response.headers.get("ETag"))
+        except Exception as e:
+            logging.error(f"Исключение при получении обновлений игры: {e}")
+            return None
+
     def join_game(self, user_id: str) -> tuple[Game, list[Player]] | None:
         try:
-            response = requests.get(f"{self.host}/join_game?user_id={user_id}").json()
+            response = self.get("join_game", {"user_id": user_id})
             if response["status"] != 200:
                 return None
-            game = Game(**response["body"]["game"])
-            users = [Player(**user) for user in response["body"]["users"]]
+            game = Game.from_dict(response["body"]["game"])
+            users = decode_players(response["body"]["users"])
             return game, users
         except Exception as e:
             logging.error(f"Исключение при присоединении к игре: {e}")
@@ -58,7 +353,7 @@ class HttpClient:
 
     def leave_game(self, user_id: str, game_id: str) -> bool:
         try:
-            response = requests.get(f"{self.host}/leave_game?user_id={user_id}&game_id={game_id}").json()
+            response = self.get("leave_game", {"user_id": user_id, "game_id": game_id})
             return response["status"] == 200
         except Exception as e:
             logging.error(f"Исключение при выходе из игры: {e}")
@@ -66,11 +361,20 @@ class HttpClient:
 
     def make_move(self, user_id: str, game_id: int, row: int, col: int, sign: str) -> Move | None:
         try:
-            url = f"{self.host}/make_move?user_id={user_id}&game_id={game_id}&row={row}&col={col}&sign={sign}"
-            response = requests.get(url).json()
+            params = {"user_id": user_id, "game_id": game_id, "row": row, "col": col, "sign": sign}
+            response = self.get("make_move", params)
             if response["status"] != 200:
                 return None
-            return Move(**response["body"]["move"])
+            return Move.from_dict(response["body"]["move"])
         except Exception as e:
             logging.error(f"Исключение при совершении хода: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def pool_stats(self) -> dict:
+        return self.transport.stats()
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,302 @@
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import Counter
+from typing import NamedTuple
+from board import Board, SIGN_X, SIGN_O
+from models import Game, Player, Move
+
+# Журнал сыгранных партий: два файла только для дописывания с записями фиксированной длины.
+# games.bin — по записи на законченную игру, moves.bin — ходы всех игр подряд. Запись игры
+# пишется после её ходов и ссылается на них (first_move, move_count), поэтому ходы одной игры
+# читаются одним срезом mmap без копирования.
+
+JOURNAL_DIR = ".journal"
+GAMES_FILE = "games.bin"
+MOVES_FILE = "moves.bin"
+
+# game_id, created_at, finished_at, first_move, move_count, x_user, o_user, winner, rows, cols, win_length, opening
+GAME_RECORD = struct.Struct("<QqqQI32s32sBBBBH6x")
+# game_id, move_id, created_at, ply, row, col, sign
+MOVE_RECORD = struct.Struct("<QQqHBBB3x")
+
+# Смещения однобайтовых полей внутри записей — для выборки столбцов срезом с шагом
+GAME_WINNER_OFFSET = 100
+MOVE_ROW_OFFSET = 26
+MOVE_COL_OFFSET = 27
+MOVE_SIGN_OFFSET = 28
+
+# Коды знаков и победителя в записях; 0 у победителя — ничья (или никто)
+SIGN_CODES = {SIGN_X: 1, SIGN_O: 2}
+SIGNS = {1: SIGN_X, 2: SIGN_O}
+# Клетка первого хода — uint16: на полях от 256 клеток её индекс в байт не помещается.
+# Метка "ходов не было" больше любого индекса клетки (поле не больше 255x255)
+NO_OPENING = 0xFFFF
+USER_ID_SIZE = 32
+
+
+class GameRecord(NamedTuple):
+    game_id: int
+    created_at: int
+    finished_at: int
+    first_move: int
+    move_count: int
+    x_user: str
+    o_user: str
+    winner: str | None
+    rows: int
+    cols: int
+    win_length: int
+    opening: tuple[int, int] | None
+
+    @classmethod
+    def unpack(cls, values: tuple) -> "GameRecord":
+        game_id, created_at, finished_at, first_move, move_count, x_user, o_user, winner, rows, cols, win_length, \
+            opening = values
+        return cls(game_id, created_at, finished_at, first_move, move_count, decode_user(x_user),
+                   decode_user(o_user), SIGNS.get(winner), rows, cols, win_length,
+                   # В журналах с однобайтовым полем метка была 255: всё за пределами поля — не ход
+                   divmod(opening, cols) if opening < rows * cols else None)
+
+    @property
+    def winner_id(self) -> str | None:
+        if self.winner is None:
+            return None
+        return self.x_user if self.winner == SIGN_X else self.o_user
+
+
+def encode_user(user_id: str | None) -> bytes:
+    # Идентификаторы длиннее поля обрезаются: журнал — для статистики, а не для авторизации
+    return (user_id or "").encode()[:USER_ID_SIZE]
+
+
+def decode_user(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode(errors="ignore")
+
+
+class GameJournal:
+    """Журнал законченных игр: дописывание, индекс по game_id и user_id, чтение через mmap.
+
+    Индекс строится при открытии по файлу игр (он маленький: одна запись на партию) и
+    дополняется при записи. Обрывок записи в конце файла после падения отбрасывается.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.paths = {GAMES_FILE: os.path.join(directory, GAMES_FILE), MOVES_FILE: os.path.join(directory, MOVES_FILE)}
+        self.record_sizes = {GAMES_FILE: GAME_RECORD.size, MOVES_FILE: MOVE_RECORD.size}
+        for name, path in self.paths.items():
+            self._truncate_partial(path, self.record_sizes[name])
+        self.files = {name: open(path, "ab") for name, path in self.paths.items()}
+        self.maps = {}  # имя файла -> (mmap, длина)
+        self.games_by_id = {}  # game_id -> номер записи в games.bin
+        self.games_by_user = {}  # user_id -> [номер записи]
+        self.move_count = os.path.getsize(self.paths[MOVES_FILE]) // MOVE_RECORD.size
+        view = self.view(GAMES_FILE)
+        if view is not None:
+            with view:
+                for index, values in enumerate(GAME_RECORD.iter_unpack(view)):
+                    self._index_game(index, values[0], decode_user(values[5]), decode_user(values[6]))
+
+    @staticmethod
+    def _truncate_partial(path: str, record_size: int):
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path)
+        if size % record_size:
+            logging.warning(f"Журнал {path}: отбрасываю недописанную запись в конце файла")
+            with open(path, "r+b") as file:
+                file.truncate(size - size % record_size)
+
+    def _index_game(self, index: int, game_id: int, x_user: str, o_user: str):
+        self.games_by_id[game_id] = index
+        for user_id in {x_user, o_user}:
+            if user_id:
+                self.games_by_user.setdefault(user_id, []).append(index)
+
+    def view(self, name: str) -> memoryview | None:
+        """memoryview всего файла поверх mmap; после дописывания отображение пересоздаётся."""
+        size = os.path.getsize(self.paths[name])
+        size -= size % self.record_sizes[name]
+        if size == 0:
+            return None
+        mapped = self.maps.get(name)
+        if mapped is None or mapped[1] != size:
+            with open(self.paths[name], "rb") as file:
+                # Старое отображение не закрываем явно: на него ещё могут ссылаться чужие memoryview
+                mapped = self.maps[name] = (mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ), size)
+        return memoryview(mapped[0])
+
+    def record_game(self, game: Game, players: list[Player], moves: list[Move], rows: int, cols: int,
+                    win_length: int) -> bool:
+        """Дописывает законченную игру и её ходы. Повторная запись той же игры пропускается."""
+        with self.lock:
+            if game.game_id in self.games_by_id:
+                return False
+            users = {player.sign: player.user_id for player in players}
+            moves = sorted(moves, key=lambda move: move.move_id)
+            winner = 0
+            if game.winner_id is not None:
+                winner = next((SIGN_CODES.get(player.sign, 0) for player in players
+                               if player.user_id == game.winner_id), 0)
+            opening = moves[0].row * cols + moves[0].col if moves else NO_OPENING
+            first_move = self.move_count
+            self.files[MOVES_FILE].write(b"".join(
+                MOVE_RECORD.pack(game.game_id, move.move_id, move.created_at, ply, move.row, move.col,
+                                 SIGN_CODES.get(move.sign, 0))
+                for ply, move in enumerate(moves)))
+            self.files[MOVES_FILE].flush()
+            finished_at = max((move.created_at for move in moves), default=game.created_at)
+            self.files[GAMES_FILE].write(GAME_RECORD.pack(
+                game.game_id, game.created_at, finished_at, first_move, len(moves), encode_user(users.get(SIGN_X)),
+                encode_user(users.get(SIGN_O)), winner, rows, cols, win_length, opening))
+            self.files[GAMES_FILE].flush()
+            self.move_count += len(moves)
+            self._index_game(len(self.games_by_id), game.game_id, users.get(SIGN_X, ""), users.get(SIGN_O, ""))
+            return True
+
+    def game(self, game_id: int) -> GameRecord | None:
+        index = self.games_by_id.get(game_id)
+        if index is None:
+            return None
+        with self.view(GAMES_FILE) as view:
+            return GameRecord.unpack(GAME_RECORD.unpack_from(view, index * GAME_RECORD.size))
+
+    def games_of_user(self, user_id: str) -> list[GameRecord]:
+        # В индексе идентификаторы в том виде, в каком они поместились в запись
+        indexes = self.games_by_user.get(decode_user(encode_user(user_id)), [])
+        if not indexes:
+            return []
+        with self.view(GAMES_FILE) as view:
+            return [GameRecord.unpack(GAME_RECORD.unpack_from(view, index * GAME_RECORD.size)) for index in indexes]
+
+    def moves(self, game_id: int) -> list[Move]:
+        record = self.game(game_id)
+        if record is None or record.move_count == 0:
+            return []
+        users = {SIGN_X: record.x_user, SIGN_O: record.o_user}
+        start = record.first_move * MOVE_RECORD.size
+        with self.view(MOVES_FILE) as view:
+            # Срез memoryview — без копирования байт
+            chunk = view[start:start + record.move_count * MOVE_RECORD.size]
+            moves = [Move(move_id, game_id, users.get(SIGNS.get(sign), ""), row, col, SIGNS.get(sign, ""), created_at)
+                     for _, move_id, created_at, _, row, col, sign in MOVE_RECORD.iter_unpack(chunk)]
+            chunk.release()
+        return moves
+
+    def replay(self, game_id: int, ply: int | None = None) -> Board | None:
+        """Доска игры после первых ply ходов (по умолчанию — после всех)."""
+        record = self.game(game_id)
+        if record is None:
+            return None
+        board = Board(record.rows, record.cols, record.win_length)
+        for move in self.moves(game_id)[:ply]:
+            board.place(move.row, move.col, move.sign)
+        return board
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        for mapped, _ in self.maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+        self.maps.clear()
+
+
+def analyze(journal: GameJournal, chunk_records: int = 1 << 20) -> dict:
+    """Статистика по всему журналу без создания объектов на каждый ход.
+
+    Файлы читаются кусками по chunk_records записей; однобайтовые поля достаются срезом
+    memoryview с шагом в длину записи (столбец целиком на C), дальше — bytes.count и Counter.
+    """
+    results = Counter()  # код победителя -> число игр
+    openings = Counter()  # (клетка первого хода, код победителя) -> число игр
+    users = {}  # user_id в байтах, как в записи -> [игры, победы, ничьи]
+    games = 0
+    game_view = journal.view(GAMES_FILE)
+    if game_view is not None:
+        with game_view:
+            step = chunk_records * GAME_RECORD.size
+            for start in range(0, len(game_view), step):
+                chunk = game_view[start:start + step]
+                winners = bytes(chunk[GAME_WINNER_OFFSET::GAME_RECORD.size])
+                for code in SIGNS:
+                    results[code] += winners.count(code)
+                results[0] += winners.count(0)
+                for values in GAME_RECORD.iter_unpack(chunk):
+                    winner = values[7]
+                    # Клетка первого хода двухбайтовая, срезом с шагом её не достать
+                    if values[11] < values[8] * values[9]:
+                        openings[(values[11], winner)] += 1
+                    for sign_code, raw_user in ((1, values[5]), (2, values[6])):
+                        stats = users.setdefault(raw_user, [0, 0, 0])
+                        stats[0] += 1
+                        if winner == sign_code:
+                            stats[1] += 1
+                        elif winner == 0:
+                            stats[2] += 1
+                games += len(winners)
+                chunk.release()
+
+    cells = Counter()  # (row, col) -> сколько раз туда ходили
+    signs = Counter()
+    moves = 0
+    move_view = journal.view(MOVES_FILE)
+    if move_view is not None:
+        with move_view:
+            step = chunk_records * MOVE_RECORD.size
+            for start in range(0, len(move_view), step):
+                chunk = move_view[start:start + step]
+                rows = bytes(chunk[MOVE_ROW_OFFSET::MOVE_RECORD.size])
+                cells.update(zip(rows, bytes(chunk[MOVE_COL_OFFSET::MOVE_RECORD.size])))
+                sign_column = bytes(chunk[MOVE_SIGN_OFFSET::MOVE_RECORD.size])
+                for code in SIGNS:
+                    signs[SIGNS[code]] += sign_column.count(code)
+                moves += len(rows)
+                chunk.release()
+
+    def rate(count: int) -> float:
+        return count / games if games else 0.0
+
+    opening_stats = {}
+    for (opening, winner), count in openings.items():
+        stats = opening_stats.setdefault(opening, {"games": 0, "x_wins": 0, "o_wins": 0, "draws": 0})
+        stats["games"] += count
+        stats[{1: "x_wins", 2: "o_wins"}.get(winner, "draws")] += count
+    return {
+        "games": games,
+        "moves": moves,
+        "x_win_rate": rate(results[1]),
+        "o_win_rate": rate(results[2]),
+        "draw_rate": rate(results[0]),
+        "openings": {str(cell): stats for cell, stats in sorted(opening_stats.items(), key=lambda item: -item[1]["games"])},
+        "users": {decode_user(user_id): {"games": played, "wins": wins, "draws": draws, "win_rate": wins / played}
+                  for user_id, (played, wins, draws) in sorted(users.items()) if user_id.rstrip(b"\0")},
+        "cells": {f"{row},{col}": count for (row, col), count in cells.most_common()},
+        "moves_by_sign": dict(signs),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Журнал сыгранных партий")
+    parser.add_argument("--dir", default=os.environ.get("TICK_CROSS_JOURNAL") or JOURNAL_DIR)
+    parser.add_argument("--replay", type=int, default=None, help="показать доску игры с этим game_id")
+    parser.add_argument("--user", default=None, help="партии этого пользователя")
+    args = parser.parse_args()
+    game_journal = GameJournal(args.dir)
+    if args.replay is not None:
+        print(game_journal.game(args.replay), game_journal.replay(args.replay))
+    elif args.user is not None:
+        for game_record in game_journal.games_of_user(args.user):
+            print(game_record)
+    else:
+        print(json.dumps(analyze(game_journal), indent=2, ensure_ascii=False))
+    game_journal.close()
@@ -0,0 +1,191 @@
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from game_state import State
+from transport import Transport
+
+# Нагрузочный тест: N виртуальных игроков проходят настоящий конечный автомат GameCore
+# (меню -> ожидание -> игра -> конец) через настоящий HttpClient, без pygame.
+# Сервер — локальная заглушка в этом же процессе или любой адрес из --host.
+
+
+class TimedTransport(Transport):
+    """Transport, который запоминает длительность каждого запроса по эндпоинтам."""
+
+    def __init__(self, host: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self.latency_lock = threading.Lock()
+        self.latencies = {}  # эндпоинт -> [секунды]
+        self.errors = {}  # эндпоинт -> число исключений
+
+    def request(self, endpoint: str, params: dict, headers: dict | None = None):
+        start = time.perf_counter()
+        try:
+            response = super().request(endpoint, params, headers)
+        except Exception:
+            with self.latency_lock:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self.latency_lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+        return response
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    """Перцентиль по ближайшему рангу; values должны быть отсортированы."""
+    if not values:
+        return None
+    rank = max(1, int(len(values) * p / 100 + 0.999999))
+    return values[min(rank, len(values)) - 1]
+
+
+class VirtualPlayer:
+    """Один бот: GameCore, которым вместо мыши управляет случайный выбор клетки."""
+
+    def __init__(self, app, games: int, game_timeout: float, rng: random.Random):
+        self.app = app
+        self.games = games
+        self.game_timeout = game_timeout
+        self.rng = rng
+        self.match_times = []
+        self.finished = 0
+        self.abandoned = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        app = self.app
+        app.prepare()
+        for _ in range(self.games):
+            if self.stopped.is_set():
+                break
+            if app.current_state != State.GAME_RUNNING:
+                app.start_waiting()
+            started = time.perf_counter()
+            deadline = started + self.game_timeout
+            matched = False
+            while app.current_state in (State.GAME_WAITING, State.GAME_RUNNING):
+                if time.perf_counter() > deadline or self.stopped.is_set():
+                    break
+                app.poll_step()
+                snapshot = app.snapshot
+                if snapshot.state != State.GAME_RUNNING or snapshot.player is None:
+                    continue
+                if not matched:
+                    matched = True
+                    self.match_times.append(time.perf_counter() - started)
+                if snapshot.can_make_move:
+                    free = list(snapshot.board.empty_indexes())
+                    if free:
+                        app.play_cell(*divmod(self.rng.choice(free), snapshot.board.cols))
+            if app.current_state == State.GAME_FINISHED:
+                self.finished += 1
+            else:
+                self.abandoned += 1
+            app.reset_game()
+
+
+def run_benchmark(players: int = 20, games: int = 3, host: str | None = None, pool_size: int | None = None,
+                  game_timeout: float = 30.0, seed: int = 0) -> dict:
+    """Прогоняет игроков и возвращает отчёт: запросы в секунду, p50/p99 по эндпоинтам, время подбора пары."""
+    # Импорт здесь: game_core читает окружение (канал обновлений) в момент импорта
+    from game_core import GameCore
+    from http_client import HttpClient
+    from stub_server import start_stub_server
+
+    server = None
+    if host is None:
+        server = start_stub_server()
+        host = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    # Одна сессия на всех ботов; по умолчанию по два соединения на бота (опрос и ход в фоне),
+    # иначе long-poll одних займёт весь пул и запросы остальных будут ждать в очереди
+    transport = TimedTransport(host, pool_size=pool_size or 2 * players)
+    rng = random.Random(seed)
+    bots = []
+    for i in range(players):
+        client = HttpClient(host, transport=transport)
+        app = GameCore(client=client, user_id=f"bot-{seed}-{i}")
+        bots.append(VirtualPlayer(app, games, game_timeout, random.Random(rng.random())))
+
+    threads = [threading.Thread(target=bot.run, daemon=True) for bot in bots]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for bot in bots:
+        bot.app.update_channel.close()
+    transport.close()
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    endpoints = {}
+    total = 0
+    for endpoint, values in sorted(transport.latencies.items()):
+        values.sort()
+        total += len(values)
+        endpoints[endpoint] = {
+            "count": len(values),
+            "errors": transport.errors.get(endpoint, 0),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        }
+    match_times = sorted(t for bot in bots for t in bot.match_times)
+    return {
+        "host": host,
+        "players": players,
+        "games_per_player": games,
+        "elapsed_s": elapsed,
+        "requests": total,
+        "requests_per_s": total / elapsed if elapsed > 0 else 0.0,
+        "games_finished": sum(bot.finished for bot in bots),
+        "games_abandoned": sum(bot.abandoned for bot in bots),
+        "time_to_match_p50_ms": percentile(match_times, 50) * 1000 if match_times else None,
+        "time_to_match_p99_ms": percentile(match_times, 99) * 1000 if match_times else None,
+        "endpoints": endpoints,
+        "transport": transport.stats(),
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Сервер {report['host']}: {report['players']} игроков x {report['games_per_player']} игр "
+        f"за {report['elapsed_s']:.2f} с",
+        f"Запросов: {report['requests']} ({report['requests_per_s']:.1f} в секунду), "
+        f"партий сыграно: {report['games_finished']}, брошено: {report['games_abandoned']}",
+    ]
+    if report["time_to_match_p50_ms"] is not None:
+        lines.append(f"Подбор пары: p50 {report['time_to_match_p50_ms']:.1f} мс, "
+                     f"p99 {report['time_to_match_p99_ms']:.1f} мс")
+    lines.append(f"{'эндпоинт':<28}{'запросов':>10}{'ошибок':>8}{'p50, мс':>10}{'p99, мс':>10}{'max, мс':>10}")
+    for endpoint, row in report["endpoints"].items():
+        lines.append(f"{endpoint:<28}{row['count']:>10}{row['errors']:>8}{row['p50_ms']:>10.2f}"
+                     f"{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест клиента крестиков-ноликов")
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--games", type=int, default=3, help="партий на каждого игрока")
+    parser.add_argument("--host", default=None, help="адрес сервера; по умолчанию — локальная заглушка")
+    parser.add_argument("--pool-size", type=int, default=None, help="размер пула соединений; по умолчанию — два на игрока")
+    parser.add_argument("--timeout", type=float, default=30.0, help="сколько ждать одну партию, с")
+    parser.add_argument("--updates", choices=("poll", "long_poll", "sse"), default=None,
+                        help="канал обновлений игры (TICK_CROSS_UPDATES)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="вывести отчёт в JSON")
+    args = parser.parse_args()
+    # Боты пишут в лог каждого загруженного пользователя — в отчёте это лишнее
+    logging.basicConfig(level=logging.WARNING)
+    if args.updates is not None:
+        os.environ["TICK_CROSS_UPDATES"] = args.updates
+    result = run_benchmark(args.players, args.games, args.host, args.pool_size, args.timeout, args.seed)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
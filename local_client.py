@@ -0,0 +1,108 @@
+import logging
+import threading
+from ai import Engine
+from http_client import GameSyncMixin, GameInfoError, decode_batch_entry, payload_error
+from models import User, Game, Player, Move, GameStatus, decode_players
+from stub_server import StubState
+
+AI_USER_ID = "ai"
+# Бюджет времени на ход компьютера, мс
+AI_MOVE_BUDGET_MS = 300
+
+
+class LocalGameClient(GameSyncMixin):
+    """Игра без сервера против Engine с тем же интерфейсом, что у HttpClient.
+
+    Правила и состояние партий — как у сервера-заглушки, а ответные ходы компьютера
+    приходят через get_game_updates так же, как ходы живого соперника.
+    """
+
+    def __init__(self, rows: int = 3, cols: int = 3, win_length: int = 3, budget_ms: float = AI_MOVE_BUDGET_MS):
+        super().__init__()
+        self.host = None
+        self.transport = None
+        self.state = StubState(rows, cols, win_length)
+        self.engine = Engine(rows, cols, win_length)
+        self.budget_ms = budget_ms
+        # Поиск хода — в отдельном потоке, по одному за раз
+        self.engine_lock = threading.Lock()
+
+    def get_user(self, user_id: str) -> User | None:
+        return User(user_id=user_id, tg_id=0, username=user_id)
+
+    def get_active_game_by_user_id(self, user_id: str) -> tuple[Game, list[Player], list[Move]] | None:
+        response = self.state.get_active_game_by_user_id(user_id)
+        if response["status"] != 200:
+            return None
+        return self.decode_game_info(response["body"])
+
+    def get_game_info(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
+        response = self.state.get_game_info(game_id)
+        if response["status"] != 200:
+            return None
+        return self.decode_game_info(response["body"])
+
+    def get_games_info(self, game_ids) -> dict[int, tuple[Game, list[Player], list[Move]] | GameInfoError]:
+        results = {}
+        for game_id in dict.fromkeys(game_ids):
+            payload = decode_batch_entry(self.state.get_game_info(game_id))
+            if payload.status == 200:
+                results[game_id] = payload.game, payload.players, payload.moves
+            else:
+                results[game_id] = payload_error(game_id, payload)
+        return results
+
+    def get_game_updates(self, game_id: int) -> tuple[Game, list[Player], list[Move]] | None:
+        params, _ = self.updates_request(game_id)
+        response = self.state.get_game_info(game_id, params.get("after_move_id", 0), params.get("version"))
+        if response["status"] != 200:
+            return None
+        return self.decode_updates(game_id, response["body"])
+
+    def join_game(self, user_id: str) -> tuple[Game, list[Player]] | None:
+        response = self.state.join_game(user_id)
+        if response["status"] != 200:
+            return None
+        if len(response["body"]["users"]) == 1:
+            # Компьютер сразу садится вторым игроком
+            self.state.join_game(AI_USER_ID)
+            response = self.state.join_game(user_id)
+        game = Game.from_dict(response["body"]["game"])
+        users = decode_players(response["body"]["users"])
+        self.schedule_reply(game.game_id)
+        return game, users
+
+    def leave_game(self, user_id: str, game_id: str) -> bool:
+        response = self.state.leave_game(user_id, int(game_id))
+        return response["status"] == 200
+
+    def make_move(self, user_id: str, game_id: int, row: int, col: int, sign: str) -> Move | None:
+        response = self.state.make_move(user_id, game_id, row, col, sign)
+        if response["status"] != 200:
+            return None
+        self.schedule_reply(game_id)
+        return Move.from_dict(response["body"]["move"])
+
+    def schedule_reply(self, game_id: int):
+        threading.Thread(target=self.reply, args=(game_id,), daemon=True).start()
+
+    def reply(self, game_id: int):
+        with self.engine_lock:
+            with self.state.changed:
+                game = self.state.games.get(game_id)
+                sign = game.sign_of(AI_USER_ID) if game is not None else None
+                if sign is None or game.status != GameStatus.ACTIVE or game.board.turn() != sign:
+                    return
+                board = game.board.copy()
+            move = self.engine.choose_move(board, self.budget_ms)
+            if move is None:
+                return
+            response = self.state.make_move(AI_USER_ID, game_id, move[0], move[1], sign)
+            if response["status"] != 200:
+                logging.error(f"Компьютер не смог сходить: {response['body']}")
+
+    def pool_stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
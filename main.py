@@ -1,167 +1,123 @@
 import sys
 import pygame
 import time
-import os
 import logging
-import traceback
-from threading import Thread
-from http_client import HttpClient
-from models import User, Game, Player, Move, GameStatus
-
-pygame.init()
-pygame.display.set_caption("Крестики-нолики")
+from typing import TYPE_CHECKING
+from frame_scheduler import FrameScheduler, REDRAW_EVENT
+from render_cache import FontRegistry, TextCache, BoardLayer
+from board import Board
+from game_state import State, GameSnapshot
+from game_core import GameCore, load_user_id, BOARD_ROWS, BOARD_COLS, NETWORK_MODE, JOURNAL_PATH
+from journal import GameJournal
+
+if TYPE_CHECKING:
+    from async_client import AsyncConnectionPool, NetworkLoop
+    from http_client import HttpClient
+    from local_client import LocalGameClient
 
 # Параметры окна
 WIDTH, HEIGHT = 400, 650
-BOARD_ROWS = 3
-BOARD_COLS = 3
 BG_COLOR = (28, 170, 156)
 WHITE = (255, 255, 255)
 BUTTON_COLOR = (52, 152, 219)
 BUTTON_HOVER_COLOR = (41, 128, 185)
 FONT_SIZE = 30
-
-# Настройка логирования
-logging.basicConfig(level=logging.INFO)
-
-# Проверка наличия файла с идентификатором пользователя
-user_file_name = ".user"
-if not os.path.isfile(user_file_name):
-    logging.error(f"Файл {user_file_name} не найден. Создаю новый...")
-    user_id_input = input("Введи идентификатор пользователя: ")
-    with open(user_file_name, "w") as user_file:
-        user_file.write(user_id_input)
-
-with open(user_file_name, "r") as user_file:
-    user_id = user_file.read().strip()
-    if user_id == "":
-        logging.error(f"Идентификатор пользователя не найден. Положи его в файл {user_file_name}")
-        sys.exit(1)
-
-# Создание экземпляра HTTP клиента
-http_client = HttpClient()
-
-# Определение состояний игры
-class State:
-    MENU = 0
-    GAME_WAITING = 1
-    GAME_RUNNING = 2
-    GAME_FINISHED = 3
-
-class GameApp:
-    def __init__(self):
-        self.clock = pygame.time.Clock()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        self.current_state = State.MENU
-        self.board = [[None] * BOARD_ROWS for _ in range(BOARD_COLS)]
-        self.player = None  # храним информацию об игроке
-        self.enemy = None  # храним информацию о противнике
-        self.game = None  # храним информацию о текущей игре
-        self.players = []  # храним информацию обо всех игроках
-        self.moves = []  # храним информацию о ходах
-        self.can_make_move = False  # флаг, который показывает, можно ли делать ход
-        self.user = None
-        self.http_client = http_client
+FPS = 60
+# Область часов MM:SS на экране ожидания: её достаточно перерисовывать раз в секунду
+WAITING_CLOCK_RECT = pygame.Rect(0, HEIGHT // 2 + 20, WIDTH, 40)
+# Шрифты как ключи FontRegistry: (имя, размер, жирный)
+TITLE_FONT = ("Arial", 36, True)
+TEXT_FONT = ("Arial", FONT_SIZE, True)
+
+
+class GameApp(GameCore):
+    """Окно pygame поверх GameCore: рисует опубликованные снимки и передаёт ядру ввод."""
+
+    def __init__(self, network_loop: "NetworkLoop | None" = None, connection_pool: "AsyncConnectionPool | None" = None,
+                 client: "HttpClient | LocalGameClient | None" = None, user_id: str | None = None,
+                 journal: GameJournal | None = None):
+        super().__init__(network_loop, connection_pool, client, user_id, journal)
+        # Кадры рисуются только при изменениях, в простое цикл спит в ожидании событий
+        self.scheduler = FrameScheduler(FPS)
+        self.menu_hover = False  # курсор над кнопкой "Играть"
+        # Окно создаётся в open_window, перед первым кадром
+        self.screen = None
+        self.rendered_version = None  # версия снимка в последнем нарисованном кадре
+
+        # Кэши отрисовки: шрифты, надписи и готовый слой игрового поля
+        self.fonts = FontRegistry()
+        self.text_cache = TextCache(self.fonts)
+        self.board_layer = BoardLayer(WIDTH, BOARD_ROWS, BOARD_COLS, BG_COLOR)
 
         # Инициализация play_button_rect здесь
         self.play_button_rect = pygame.Rect(WIDTH // 2 - 75, HEIGHT // 2, 150, 50)
 
-        self.waiting_start_time = None  # Время начала ожидания второго игрока
+    def open_window(self) -> pygame.Surface:
+        """Инициализирует только нужные модули pygame (экран и шрифты, без звука и джойстиков)."""
+        if self.screen is None:
+            pygame.font.init()
+            pygame.display.init()
+            pygame.display.set_caption("Крестики-нолики")
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        return self.screen
 
-    def prepare(self):
-        while self.user is None:
-            fetched_user = self.http_client.get_user(user_id)
-            if fetched_user is None:
-                logging.error(f"Пользователь с таким идентификатором не найден. Проверьте файл {user_file_name}")
-                time.sleep(1)
-                continue
-            self.user = fetched_user
-            logging.info(f"Пользователь успешно загружен: {self.user}")
-            # Проверяем, есть ли уже активная игра
-            already_running_game = self.http_client.get_active_game_by_user_id(self.user.user_id)
-            if already_running_game is not None:
-                game, players, moves = already_running_game
-                self.update_game_info(game, players, moves, State.GAME_RUNNING)
-
-    def refill_board(self, moves):
-        new_board = [[None] * BOARD_ROWS for _ in range(BOARD_COLS)]
-        if moves is not None:
-            for move in moves:
-                new_board[move.row][move.col] = move.sign
-        self.board = new_board
-
-    def update_game_info(self, game: Game, players: list[Player], moves: list[Move], current_state: State):
-        self.game = game
-        self.moves = moves
-        self.refill_board(moves)
-        self.player = next((user for user in players if user.user_id == self.user.user_id), None) if len(players) == 2 else None
-        self.enemy = next((user for user in players if user.user_id != self.user.user_id), None) if len(players) == 2 else None
-        self.players = players
-
-        # Если переходим из состояния ожидания в другое, сбрасываем таймер ожидания
-        if self.current_state == State.GAME_WAITING and current_state != State.GAME_WAITING:
-            self.waiting_start_time = None
-
-        self.current_state = current_state
+    def wake(self):
+        # Цикл отрисовки сверит версию снимка и перерисует кадр; пока окна нет, будить некого
+        if pygame.display.get_init():
+            self.scheduler.wake()
 
     def check_game_events(self, events):
         for event in events:
-            if event.type == pygame.MOUSEBUTTONDOWN and self.can_make_move:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                cell_size = WIDTH // 3
-                col = (mouse_x - 0) // cell_size
-                row = (mouse_y - 0) // cell_size
-                if row < BOARD_ROWS and col < BOARD_COLS and self.board[row][col] is None:
-                    self.can_make_move = False
-                    self.board[row][col] = self.player.sign
-                    self.http_client.make_move(self.user.user_id, self.game.game_id, row, col, self.player.sign)
+            if event.type == pygame.MOUSEBUTTONDOWN and self.snapshot.can_make_move:
+                # Поле нарисовано в углу (0, 0), клетки считает тот же слой, что их рисует
+                cell = self.board_layer.cell_at(*pygame.mouse.get_pos())
+                if cell is not None:
+                    self.play_cell(*cell)
 
-    def reset_game(self):
-        if self.game is not None and self.user is not None:
-            self.http_client.leave_game(self.user.user_id, self.game.game_id)
-        self.game = None
-        self.players = []
-        self.moves = []
-        self.board = [[None] * BOARD_ROWS for _ in range(BOARD_COLS)]
-        self.can_make_move = False
-        self.player = None
-        self.enemy = None
-        self.current_state = State.MENU
-        self.waiting_start_time = None  # Сброс таймера ожидания при перезапуске игры
-
-    def check_events(self):
-        events = pygame.event.get()
+    def check_events(self, events):
         for event in events:
             if event.type == pygame.QUIT:
-                if self.game is not None and self.user is not None and self.current_state != State.GAME_FINISHED:
-                    self.http_client.leave_game(self.user.user_id, self.game.game_id)
+                self.shutdown()
                 pygame.quit()
                 sys.exit(0)
-        if self.current_state == State.MENU:
-            self.check_button_events()
-        if self.current_state == State.GAME_RUNNING:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                self.export_metrics()
+        state = self.snapshot.state
+        if state == State.MENU:
+            self.check_button_events(events)
+        if state == State.GAME_RUNNING:
             self.check_game_events(events)
-        if self.current_state == State.GAME_FINISHED:
-            for event in events:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.reset_game()
-        if self.current_state == State.GAME_WAITING:
+        if state in (State.GAME_FINISHED, State.GAME_WAITING):
             for event in events:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.reset_game()
+                        break
 
-    def check_button_events(self):
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_click = pygame.mouse.get_pressed()
-        if self.play_button_rect.collidepoint(mouse_pos) and mouse_click[0]:
-            self.current_state = State.GAME_WAITING
-            self.waiting_start_time = time.time()  # Фиксируем время начала ожидания
+    def check_button_events(self, events):
+        clicked = any(event.type == pygame.MOUSEBUTTONDOWN and event.button == 1
+                      and self.play_button_rect.collidepoint(event.pos) for event in events)
+        if clicked:
+            self.start_waiting()
+
+    def invalidate(self, events):
+        """Помечает, что перерисовать после событий ввода."""
+        for event in events:
+            if event.type == REDRAW_EVENT:
+                # Экран уже помечен тем, кто прислал событие, или вышел новый снимок состояния
+                continue
+            if event.type == pygame.MOUSEMOTION:
+                # Движение мыши меняет только подсветку кнопки в меню
+                if self.snapshot.state == State.MENU:
+                    hover = self.play_button_rect.collidepoint(event.pos)
+                    if hover != self.menu_hover:
+                        self.menu_hover = hover
+                        self.scheduler.mark_dirty(self.play_button_rect)
+                continue
+            self.scheduler.mark_dirty()
 
     def draw_menu(self):
-        font = pygame.font.SysFont("Arial", 36, True)
-        text = font.render("Крестики-нолики", True, WHITE)
+        text = self.text_cache.render("Крестики-нолики", TITLE_FONT, WHITE)
         self.screen.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 100)))
         # Кнопка "Играть"
         self.play_button_rect = pygame.Rect(WIDTH // 2 - 75, HEIGHT // 2, 150, 50)  # Это можно оставить
@@ -170,157 +126,126 @@ class GameApp:
             pygame.draw.rect(self.screen, BUTTON_HOVER_COLOR, self.play_button_rect)
         else:
             pygame.draw.rect(self.screen, BUTTON_COLOR, self.play_button_rect)
-        play_text = font.render("Играть", True, WHITE)
+        play_text = self.text_cache.render("Играть", TITLE_FONT, WHITE)
         self.screen.blit(play_text, play_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 25)))
 
-    def get_info(self):
-        while True:
-            try:
-                time.sleep(0.5)
-                if self.current_state == State.GAME_WAITING:
-                    game, players, moves = None, [], []
-                    if self.game is None:
-                        response = self.http_client.join_game(self.user.user_id)
-                        if response is None:
-                            continue
-                        game, players = response
-                        self.game = game
-                        self.players = players
-                    else:
-                        game_info = self.http_client.get_game_info(self.game.game_id)
-                        if game_info is None:
-                            continue
-                        game, players, moves = game_info
-                    if game is not None:
-                        state = State.GAME_RUNNING if len(players) == 2 else State.GAME_WAITING
-                        self.update_game_info(game, players, moves, state)
-                    continue
-                if self.current_state == State.GAME_RUNNING:
-                    game_info = self.http_client.get_game_info(self.game.game_id)
-                    if game_info is None:
-                        continue
-                    game, players, moves = game_info
-                    state = State.GAME_RUNNING if game.status == GameStatus.ACTIVE.value else State.GAME_FINISHED
-                    self.update_game_info(game, players, moves, state)
-            except Exception:
-                logging.error(f"Ошибка при получении информации: {traceback.format_exc()}")
-
-    def draw_nicknames(self, players):
-        font = pygame.font.SysFont("Arial", FONT_SIZE, True)
-        user1, user2 = players
+    def draw_nicknames(self, snapshot: GameSnapshot):
+        user1, user2 = snapshot.players
         # Делаем так, чтобы крестики всегда были слева
         if user1.sign == '0':
             user1, user2 = user2, user1
-        text = font.render(f"X {user1.username} VS {user2.username} O", True, WHITE)
+        text = self.text_cache.render(f"X {user1.username} VS {user2.username} O", TEXT_FONT, WHITE)
         self.screen.blit(text, text.get_rect(center=(WIDTH // 2, 450)))
-        if self.can_make_move:
-            text = font.render("Твой ход!", True, WHITE)
+        if snapshot.can_make_move:
+            text = self.text_cache.render("Твой ход!", TEXT_FONT, WHITE)
             self.screen.blit(text, text.get_rect(center=(WIDTH // 2, 400)))
 
-    def draw_game_waiting(self):
-        font = pygame.font.SysFont("Arial", FONT_SIZE, True)
-        text = font.render("Ожидание второго игрока...", True, WHITE)
+    def draw_game_waiting(self, snapshot: GameSnapshot):
+        text = self.text_cache.render("Ожидание второго игрока...", TEXT_FONT, WHITE)
         self.screen.blit(text, text.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
 
-        if self.waiting_start_time is not None:
-            elapsed_time = int(time.time() - self.waiting_start_time)
+        if snapshot.waiting_start_time is not None:
+            elapsed_time = int(time.time() - snapshot.waiting_start_time)
             minutes = elapsed_time // 60
             seconds = elapsed_time % 60
             # Форматируем время как MM:SS с ведущими нулями
             time_text = f"{minutes:02d}:{seconds:02d}"
-            time_render = font.render(time_text, True, WHITE)
+            time_render = self.text_cache.render(time_text, TEXT_FONT, WHITE)
             # Расположим таймер под основным текстом
             self.screen.blit(time_render, time_render.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 40)))
 
-    def check_can_make_move(self):
-        can_make_move = True
-        sign = self.player.sign
-        count_x = sum([1 for row in self.board for cell in row if cell == 'X'])
-        count_0 = sum([1 for row in self.board for cell in row if cell == '0'])
-        if sign == 'X' and count_x > count_0:
-            can_make_move = False
-        if sign == '0' and count_0 >= count_x:
-            can_make_move = False
-        return can_make_move
-
-    def draw_lines(self):
-        # Отрисовка линий сетки
-        line_color = (23, 145, 135)
-        for i in range(1, 3):
-            # Вертикальные линии
-            pygame.draw.line(self.screen, line_color, (i * WIDTH // 3, 0), (i * WIDTH // 3, WIDTH), 7)
-            # Горизонтальные линии
-            pygame.draw.line(self.screen, line_color, (0, i * WIDTH // 3), (WIDTH, i * WIDTH // 3), 7)
+    def draw_board(self, board: Board):
+        # Сетка и фигуры берутся из готового слоя, он перерисовывается только после нового хода
+        self.screen.blit(self.board_layer.render(board), (0, 0))
 
-    def draw_figures(self):
-        for row in range(BOARD_ROWS):
-            for col in range(BOARD_COLS):
-                if self.board[row][col] == '0':
-                    self.draw_circle(row, col)
-                elif self.board[row][col] == 'X':
-                    self.draw_cross(row, col)
-
-    def draw_cross(self, row, col):
-        x_color = (84, 84, 84)
-        x_start_x = col * WIDTH // 3 + 55
-        x_start_y = row * WIDTH // 3 + 55
-        x_end_x = col * WIDTH // 3 + WIDTH // 3 - 55
-        x_end_y = row * WIDTH // 3 + WIDTH // 3 - 55
-        pygame.draw.line(self.screen, x_color, (x_start_x, x_start_y), (x_end_x, x_end_y), 15)
-        pygame.draw.line(self.screen, x_color, (x_start_x, x_end_y), (x_end_x, x_start_y), 15)
-
-    def draw_circle(self, row, col):
-        o_color = (242, 235, 211)
-        center_x = col * WIDTH // 3 + WIDTH // 6
-        center_y = row * WIDTH // 3 + WIDTH // 6
-        pygame.draw.circle(self.screen, o_color, (center_x, center_y), WIDTH // 6 - 55, 15)
-
-    def draw_game_running(self):
-        if self.game is None:
-            return
-        if self.game.status == GameStatus.FINISHED.value:
-            self.current_state = State.GAME_FINISHED
-            self.refill_board(self.moves)
+    def draw_game_running(self, snapshot: GameSnapshot):
+        if snapshot.game is None or len(snapshot.players) != 2:
             return
-        self.can_make_move = self.check_can_make_move()
-        self.draw_nicknames(self.players)
-        self.draw_lines()
-        self.draw_figures()
+        self.draw_nicknames(snapshot)
+        self.draw_board(snapshot.board)
 
-    def draw_game_finished(self):
+    def draw_game_finished(self, snapshot: GameSnapshot):
         winner = None
-        if self.game.winner_id is not None:
-            winner = self.user if self.game.winner_id == self.user.user_id else self.enemy
-        font = pygame.font.SysFont("Arial", FONT_SIZE, True)
+        winner_id = snapshot.game.winner_id if snapshot.game is not None else None
+        if winner_id is not None:
+            winner = self.user if winner_id == self.user.user_id else snapshot.enemy
         if winner is None:
-            text = font.render("Ничья!", True, WHITE)
+            text = self.text_cache.render("Ничья!", TEXT_FONT, WHITE)
         else:
-            text = font.render(f"Победитель — {winner.username}!", True, WHITE)
+            text = self.text_cache.render(f"Победитель — {winner.username}!", TEXT_FONT, WHITE)
         self.screen.blit(text, text.get_rect(center=(WIDTH // 2, 450)))
-        self.draw_lines()
-        self.draw_figures()
+        self.draw_board(snapshot.board)
 
     def run(self):
-        info_thread = Thread(target=self.get_info)
-        info_thread.daemon = True
-        info_thread.start()
-        prepare_thread = Thread(target=self.prepare)
-        prepare_thread.daemon = True
-        prepare_thread.start()
+        # Сеть стартует раньше окна: первый запрос к серверу не ждёт создания окна и шрифтов
+        self.start()
+        self.open_window()
         while True:
-            self.clock.tick(60)
-            self.screen.fill(BG_COLOR)
-            self.check_events()
-            if self.current_state == State.MENU:
-                self.draw_menu()
-            if self.current_state == State.GAME_WAITING:
-                self.draw_game_waiting()
-            if self.current_state == State.GAME_RUNNING:
-                self.draw_game_running()
-            if self.current_state == State.GAME_FINISHED:
-                self.draw_game_finished()
-            pygame.display.flip()
+            self.run_frame()
+
+    def run_frame(self) -> bool:
+        """Одна итерация цикла: события и, если экран грязный, кадр. True, если кадр нарисован."""
+        events = self.scheduler.wait_events()
+        self.invalidate(events)
+        self.check_events(events)
+        # Один снимок на весь кадр: поток опроса может опубликовать новый, но кадр его не "порвёт"
+        snapshot = self.snapshot
+        if snapshot.version != self.rendered_version:
+            self.scheduler.mark_dirty()
+        # Часы ожидания тикают раз в секунду, остальные экраны статичны
+        self.scheduler.set_timer("waiting_clock", 1.0 if snapshot.state == State.GAME_WAITING else None,
+                                 WAITING_CLOCK_RECT)
+        clip = self.scheduler.begin_frame()
+        if clip is None:
+            return False
+        frame_start = time.perf_counter() if self.metrics.enabled else 0.0
+        self.screen.set_clip(clip)
+        self.screen.fill(BG_COLOR)
+        if snapshot.state == State.MENU:
+            self.draw_step("menu", self.draw_menu)
+        if snapshot.state == State.GAME_WAITING:
+            self.draw_step("game_waiting", self.draw_game_waiting, snapshot)
+        if snapshot.state == State.GAME_RUNNING:
+            self.draw_step("game_running", self.draw_game_running, snapshot)
+        if snapshot.state == State.GAME_FINISHED:
+            self.draw_step("game_finished", self.draw_game_finished, snapshot)
+        self.screen.set_clip(None)
+        self.scheduler.end_frame()
+        self.rendered_version = snapshot.version
+        if self.metrics.enabled:
+            self.observe_frame(frame_start, snapshot)
+        return True
+
+    def draw_step(self, screen: str, draw, *args):
+        if not self.metrics.enabled:
+            draw(*args)
+            return
+        start = time.perf_counter()
+        draw(*args)
+        self.metrics.observe("draw_seconds", time.perf_counter() - start, {"screen": screen})
+
+    def observe_frame(self, frame_start: float, snapshot: GameSnapshot):
+        now = time.perf_counter()
+        self.metrics.observe("frame_seconds", now - frame_start)
+        # Ход соперника, полученный опросом, теперь на экране
+        received_at = self.opponent_move_at
+        if received_at is not None and snapshot.state in (State.GAME_RUNNING, State.GAME_FINISHED):
+            self.opponent_move_at = None
+            self.metrics.observe("poll_to_render_seconds", now - received_at)
+
 
 if __name__ == "__main__":
-    game_app = GameApp()
-    game_app.run()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO)
+    # Идентификатор спрашиваем до окна и сети: input() в фоновом потоке заблокировал бы их
+    try:
+        user_id = load_user_id()
+    except ValueError as e:
+        logging.error(e)
+        sys.exit(1)
+    network_loop = None
+    if NETWORK_MODE == "asyncio":
+        import async_client
+        network_loop = async_client.NetworkLoop()
+    game_app = GameApp(network_loop, user_id=user_id,
+                       journal=GameJournal(JOURNAL_PATH) if JOURNAL_PATH else None)
+    game_app.run()
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+from bisect import bisect_left
+
+# Границы корзин гистограмм, секунды: от долей кадра до долгих запросов к серверу
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.002, 0.004, 0.008, 0.016, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Все метрики в экспорте получают этот префикс
+PREFIX = "tick_cross_"
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как в Prometheus; перцентили — оценка по корзинам."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя корзина — +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, p: float) -> float | None:
+        """Верхняя граница корзины, в которую попадает p-й перцентиль."""
+        if self.count == 0:
+            return None
+        rank = self.count * p / 100
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "sum": self.sum, "p50": self.percentile(50), "p99": self.percentile(99),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}}
+
+
+class Metrics:
+    """Счётчики и гистограммы с метками.
+
+    Выключенные метрики почти ничего не стоят: горячие пути проверяют enabled и не зовут
+    perf_counter, а inc/observe сразу возвращаются.
+    """
+
+    def __init__(self, enabled: bool = False, export_path: str | None = None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.lock = threading.Lock()
+        self.counters = {}  # (имя, метки) -> число
+        self.histograms = {}  # (имя, метки) -> Histogram
+        self.help = {}
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def inc(self, name: str, labels: dict | None = None, value: int = 1):
+        if not self.enabled:
+            return
+        key = (name, tuple(labels.items()) if labels else ())
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, labels: dict | None = None):
+        if not self.enabled:
+            return
+        key = (name, tuple(labels.items()) if labels else ())
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "histograms": [{"name": name, "labels": dict(labels), **histogram.to_dict()}
+                               for (name, labels), histogram in sorted(self.histograms.items())],
+            }
+
+    def to_prometheus(self) -> str:
+        """Текстовый формат экспозиции Prometheus (для node_exporter textfile и т.п.)."""
+        lines = []
+        typed = set()
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+            for (name, labels), value in counters:
+                self._header(lines, typed, name, "counter")
+                lines.append(f"{PREFIX}{name}{format_labels(labels)} {value}")
+            for (name, labels), histogram in histograms:
+                self._header(lines, typed, name, "histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{PREFIX}{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list[str], typed: set, name: str, kind: str):
+        if name in typed:
+            return
+        typed.add(name)
+        if name in self.help:
+            lines.append(f"# HELP {PREFIX}{name} {self.help[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    def export(self, path: str | None = None) -> str | None:
+        """Записывает снимок в файл: .json — JSON, иначе текст Prometheus. Возвращает путь."""
+        path = path or self.export_path
+        if path is None:
+            return None
+        data = json.dumps(self.snapshot(), indent=2) if path.endswith(".json") else self.to_prometheus()
+        # Через временный файл, чтобы сборщик не прочитал файл наполовину записанным
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metrics_from_env() -> Metrics:
+    """TICK_CROSS_METRICS=путь включает метрики; снимок пишется туда по запросу и при выходе."""
+    path = os.environ.get("TICK_CROSS_METRICS")
+    return Metrics(enabled=bool(path), export_path=path or None)
+
+
+# Общие метрики процесса: их пишут HttpClient и GameApp
+metrics = metrics_from_env()
+metrics.describe("http_requests_total", "Запросы к серверу по эндпоинту и исходу: ok, error (status != 200), exception")
+metrics.describe("http_request_seconds", "Время запроса к серверу")
+metrics.describe("frame_seconds", "Время отрисовки кадра")
+metrics.describe("draw_seconds", "Время функций draw_* по экрану")
+metrics.describe("poll_to_render_seconds", "От получения хода соперника при опросе до вывода кадра с ним")
@@ -1,47 +1,215 @@
+import json
 from enum import Enum
+from operator import itemgetter
+from typing import NamedTuple
+
+# Модели — NamedTuple: без __dict__ у экземпляров, неизменяемые, создаются одним tuple.__new__.
+# Это важно для реплеев и нагрузочных клиентов, которые держат в памяти миллионы ходов.
+_new = tuple.__new__
+
+# Знаки игроков; сервер может прислать нолик числом 0
+SIGN_X = 'X'
+SIGN_O = '0'
+SIGNS = frozenset((SIGN_X, SIGN_O))
+
+
+def decode_sign(value) -> str:
+    sign = str(value)
+    if sign not in SIGNS:
+        raise ValueError(f"Неизвестный знак: {value!r}")
+    return sign
+
+
+def decode_int(value) -> int:
+    """Целое из JSON: int или строка с целым числом. 1.9 и True не округляются молча, а отклоняются."""
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        return int(value)
+    raise ValueError(f"Ожидалось целое число: {value!r}")
+
 
 class GameStatus(Enum):
     NEW = 0
     ACTIVE = 1
     FINISHED = 2
 
-class User:
-    def __init__(self, user_id: str, tg_id: int, username: str):
-        self.user_id = user_id
-        self.tg_id = tg_id
-        self.username = username
+    @classmethod
+    def coerce(cls, value) -> "GameStatus":
+        """Статус из числа сервера, имени ("ACTIVE") или самого GameStatus."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, str) and not value.isdigit():
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Неизвестный статус игры: {value!r}") from None
+        return cls(decode_int(value))
+
+
+class User(NamedTuple):
+    user_id: str
+    tg_id: int
+    username: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "User":
+        try:
+            return _new(cls, (str(data["user_id"]), decode_int(data["tg_id"]), str(data["username"])))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Некорректный пользователь: {data!r}") from e
+
+    def to_dict(self) -> dict:
+        return {"user_id": self.user_id, "tg_id": self.tg_id, "username": self.username}
 
     def __repr__(self):
         return f"User(user_id='{self.user_id}', tg_id={self.tg_id}, username='{self.username}')"
 
-class Player:
-    def __init__(self, user_id: str, username: str, sign: str):
-        self.user_id = user_id
-        self.username = username
-        self.sign = str(sign)  # Изменение здесь
+
+class Player(NamedTuple):
+    user_id: str
+    username: str
+    sign: str
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Player":
+        try:
+            # Знак всегда строка: сервер может прислать нолик числом 0
+            return _new(cls, (str(data["user_id"]), str(data["username"]), decode_sign(data["sign"])))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Некорректный игрок: {data!r}") from e
+
+    def to_dict(self) -> dict:
+        return {"user_id": self.user_id, "username": self.username, "sign": self.sign}
 
     def __repr__(self):
         return f"Player(user_id='{self.user_id}', username='{self.username}', sign='{self.sign}')"
 
-class Game:
-    def __init__(self, game_id: int, status: GameStatus, created_at: int, winner_id: str = None):
-        self.game_id = game_id
-        self.status = status
-        self.created_at = created_at
-        self.winner_id = winner_id
+
+class Game(NamedTuple):
+    game_id: int
+    status: GameStatus
+    created_at: int
+    winner_id: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Game":
+        try:
+            winner_id = data.get("winner_id")
+            return _new(cls, (decode_int(data["game_id"]), GameStatus.coerce(data["status"]),
+                              decode_int(data["created_at"]), None if winner_id is None else str(winner_id)))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Некорректная игра: {data!r}") from e
+
+    def to_dict(self) -> dict:
+        return {"game_id": self.game_id, "status": self.status.value,
+                "created_at": self.created_at, "winner_id": self.winner_id}
 
     def __repr__(self):
         return f"Game(game_id={self.game_id}, status={self.status}, created_at={self.created_at}, winner_id='{self.winner_id}')"
 
-class Move:
-    def __init__(self, move_id: int, game_id: int, user_id: str, row: int, col: int, sign: str, created_at: int):
-        self.move_id = move_id
-        self.game_id = game_id
-        self.user_id = user_id
-        self.row = row
-        self.col = col
-        self.sign = str(sign)  # Изменение здесь
-        self.created_at = created_at
+
+class Move(NamedTuple):
+    move_id: int
+    game_id: int
+    user_id: str
+    row: int
+    col: int
+    sign: str
+    created_at: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Move":
+        try:
+            return _new(cls, (decode_int(data["move_id"]), decode_int(data["game_id"]), str(data["user_id"]),
+                              decode_int(data["row"]), decode_int(data["col"]), decode_sign(data["sign"]),
+                              decode_int(data["created_at"])))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Некорректный ход: {data!r}") from e
+
+    def to_dict(self) -> dict:
+        return {"move_id": self.move_id, "game_id": self.game_id, "user_id": self.user_id, "row": self.row,
+                "col": self.col, "sign": self.sign, "created_at": self.created_at}
 
     def __repr__(self):
-        return f"Move(move_id={self.move_id}, game_id={self.game_id}, user_id='{self.user_id}', row={self.row}, col={self.col}, sign='{self.sign}', created_at={self.created_at})"
\ No newline at end of file
+        return f"Move(move_id={self.move_id}, game_id={self.game_id}, user_id='{self.user_id}', row={self.row}, col={self.col}, sign='{self.sign}', created_at={self.created_at})"
+
+
+class GamePayload(NamedTuple):
+    """Разобранный ответ get_game_info. game и players — None, если сервер их опустил (версия не менялась)."""
+    status: int
+    game: Game | None
+    players: list[Player] | None
+    moves: list[Move]
+    version: int | None
+
+
+# Поля ходов и игроков достаются из словаря одним вызовом на C, без Python-цикла по ключам
+_move_fields = itemgetter("move_id", "game_id", "user_id", "row", "col", "sign", "created_at")
+_player_fields = itemgetter("user_id", "username", "sign")
+
+
+def columns_have_types(rows: list[tuple], types: tuple) -> bool:
+    """Проверка типов по столбцам: set(map(type, ...)) идёт на C, без Python-цикла по строкам."""
+    for column, expected in zip(zip(*rows), types):
+        if expected is SIGNS:
+            if not SIGNS.issuperset(column):
+                return False
+        elif set(map(type, column)) != {expected}:
+            return False
+    return True
+
+
+_move_types = (int, int, str, int, int, SIGNS, int)
+_player_types = (str, str, SIGNS)
+
+
+def decode_moves(moves: list[dict], after_move_id: int = 0) -> list[Move]:
+    """Массовое создание Move из словарей сервера; ходы с move_id <= after_move_id отбрасываются.
+
+    Быстрый путь не приводит типы, а только проверяет их по столбцам. Если что-то пришло не тем
+    типом (например, row строкой), список разбирается через Move.from_dict: он приведёт строки с числами
+    или бросит ValueError с самим ходом, а не даст ему упасть позже внутри Board.
+    """
+    try:
+        decoded = [_new(Move, (move_id, game_id, user_id, row, col, str(sign), created_at))
+                   for move_id, game_id, user_id, row, col, sign, created_at in map(_move_fields, moves)
+                   if move_id > after_move_id]
+        if columns_have_types(decoded, _move_types):
+            return decoded
+    except (KeyError, TypeError):
+        pass
+    return [move for move in map(Move.from_dict, moves) if move.move_id > after_move_id]
+
+
+def decode_players(users: list[dict]) -> list[Player]:
+    try:
+        decoded = [_new(Player, (user_id, username, str(sign))) for user_id, username, sign in map(_player_fields, users)]
+        if columns_have_types(decoded, _player_types):
+            return decoded
+    except (KeyError, TypeError):
+        pass
+    return [Player.from_dict(user) for user in users]
+
+
+def decode_game_body(body: dict, after_move_id: int = 0, status: int = 200) -> GamePayload:
+    """Тело ответа get_game_info (уже разобранный JSON) целиком в модели."""
+    game_data = body.get("game")
+    if game_data is None:
+        game, players = None, None
+    else:
+        game = Game.from_dict(game_data)
+        players = decode_players(body["users"])
+    return GamePayload(status, game, players, decode_moves(body.get("moves", ()), after_move_id), body.get("version"))
+
+
+def decode_game_payload(payload: bytes | str, after_move_id: int = 0) -> GamePayload:
+    """Ответ get_game_info как есть (байты JSON) в модели за один проход.
+
+    Для ответа с ошибкой возвращает только status, модели не создаются.
+    """
+    response = json.loads(payload)
+    status = response.get("status")
+    if status != 200:
+        return GamePayload(status, None, None, [], None)
+    return decode_game_body(response["body"], after_move_id, status)
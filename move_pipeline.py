@@ -0,0 +1,77 @@
+import logging
+import queue
+import threading
+import time
+from models import Move
+
+
+class PendingMove:
+    """Ход, уже показанный на доске, но ещё не подтверждённый сервером."""
+
+    def __init__(self, game_id: int, row: int, col: int, sign: str):
+        self.game_id = game_id
+        self.row = row
+        self.col = col
+        self.sign = sign
+        self.submitted_at = time.monotonic()
+
+    def __repr__(self):
+        return f"PendingMove(game_id={self.game_id}, row={self.row}, col={self.col}, sign='{self.sign}')"
+
+
+class MovePipeline:
+    """Очередь ходов: цикл отрисовки кладёт ход и сразу продолжает, отправкой занимается фоновый поток.
+
+    send(pending) выполняет запрос и возвращает Move или None, on_result(pending, move)
+    вызывается из фонового потока после ответа сервера.
+    """
+
+    def __init__(self, send, on_result):
+        self.send = send
+        self.on_result = on_result
+        self.pending = {}  # (row, col) -> PendingMove
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.worker = None
+
+    def track(self, game_id: int, row: int, col: int, sign: str) -> PendingMove:
+        pending = PendingMove(game_id, row, col, sign)
+        with self.lock:
+            self.pending[(row, col)] = pending
+        return pending
+
+    def submit(self, game_id: int, row: int, col: int, sign: str) -> PendingMove:
+        pending = self.track(game_id, row, col, sign)
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self._drain, daemon=True)
+            self.worker.start()
+        self.queue.put(pending)
+        return pending
+
+    def _drain(self):
+        while True:
+            pending = self.queue.get()
+            move = None
+            try:
+                move = self.send(pending)
+            except Exception as e:
+                logging.error(f"Исключение при отправке хода {pending}: {e}")
+            self.resolve(pending, move)
+
+    def resolve(self, pending: PendingMove, move: Move | None):
+        with self.lock:
+            if self.pending.get((pending.row, pending.col)) is pending:
+                del self.pending[(pending.row, pending.col)]
+        self.on_result(pending, move)
+
+    def snapshot(self) -> list[PendingMove]:
+        with self.lock:
+            return list(self.pending.values())
+
+    def discard(self, row: int, col: int):
+        with self.lock:
+            self.pending.pop((row, col), None)
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+import pygame
+
+# Цвета фигур и сетки
+LINE_COLOR = (23, 145, 135)
+X_COLOR = (84, 84, 84)
+O_COLOR = (242, 235, 211)
+
+
+class FontRegistry:
+    """Шрифты загружаются один раз: SysFont ищет файл шрифта в системе, это дорого."""
+
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, font_key: tuple[str, int, bool]) -> pygame.font.Font:
+        font = self.fonts.get(font_key)
+        if font is None:
+            name, size, bold = font_key
+            font = self.fonts[font_key] = pygame.font.SysFont(name, size, bold)
+        return font
+
+
+class TextCache:
+    """LRU отрисованных надписей по ключу (текст, шрифт, цвет)."""
+
+    def __init__(self, fonts: FontRegistry, max_size: int = 128):
+        self.fonts = fonts
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text: str, font_key: tuple[str, int, bool], color: tuple[int, int, int]) -> pygame.Surface:
+        key = (text, font_key, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.fonts.get(font_key).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+class BoardLayer:
+    """Заранее отрисованное игровое поле: сетка рисуется один раз, фигуры — только после нового хода."""
+
+    def __init__(self, size: int, rows: int, cols: int, background: tuple[int, int, int]):
+        self.size = size
+        self.rows = rows
+        self.cols = cols
+        # Поле квадратное, клетки — нет, если строк и столбцов разное число
+        self.cell_width = size // cols
+        self.cell_height = size // rows
+        self.background = background
+        self.grid = self._render_grid()
+        self.surface = None
+        self.key = None
+        self.redraws = 0
+
+    def _new_surface(self) -> pygame.Surface:
+        surface = pygame.Surface((self.size, self.size))
+        # convert() ускоряет blit, но требует открытого окна
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def _render_grid(self) -> pygame.Surface:
+        grid = self._new_surface()
+        grid.fill(self.background)
+        for i in range(1, self.cols):
+            # Вертикальные линии
+            x = i * self.cell_width
+            pygame.draw.line(grid, LINE_COLOR, (x, 0), (x, self.size), 7)
+        for i in range(1, self.rows):
+            # Горизонтальные линии
+            y = i * self.cell_height
+            pygame.draw.line(grid, LINE_COLOR, (0, y), (self.size, y), 7)
+        return grid
+
+    def cell_at(self, x: int, y: int) -> tuple[int, int] | None:
+        """Клетка (строка, столбец) под точкой поля или None, если точка вне клеток."""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return None
+        # Остаток от деления размера поля на число клеток достаётся последней строке и столбцу
+        return min(y // self.cell_height, self.rows - 1), min(x // self.cell_width, self.cols - 1)
+
+    def render(self, board) -> pygame.Surface:
+        """Возвращает поле с фигурами; перерисовывает его, только если на доске изменились фигуры.
+
+        Ключ — битовые маски доски, а не сам объект: снимки состояния каждый раз несут новую копию доски.
+        """
+        key = (board.x, board.o)
+        if self.surface is not None and key == self.key:
+            return self.surface
+        surface = self.surface if self.surface is not None else self._new_surface()
+        surface.blit(self.grid, (0, 0))
+        for row in range(self.rows):
+            for col in range(self.cols):
+                sign = board.get(row, col)
+                if sign == '0':
+                    self.draw_circle(surface, row, col)
+                elif sign == 'X':
+                    self.draw_cross(surface, row, col)
+        self.surface = surface
+        self.key = key
+        self.redraws += 1
+        return surface
+
+    def draw_cross(self, surface, row, col):
+        # Пропорции фигур — по меньшей стороне клетки, чтобы они не вылезали за сетку
+        cell = min(self.cell_width, self.cell_height)
+        margin = cell * 55 // 133
+        center_x = col * self.cell_width + self.cell_width // 2
+        center_y = row * self.cell_height + self.cell_height // 2
+        half = cell // 2 - margin
+        x_start_x = center_x - half
+        x_start_y = center_y - half
+        x_end_x = center_x + half
+        x_end_y = center_y + half
+        width = max(2, cell * 15 // 133)
+        pygame.draw.line(surface, X_COLOR, (x_start_x, x_start_y), (x_end_x, x_end_y), width)
+        pygame.draw.line(surface, X_COLOR, (x_start_x, x_end_y), (x_end_x, x_start_y), width)
+
+    def draw_circle(self, surface, row, col):
+        cell = min(self.cell_width, self.cell_height)
+        center_x = col * self.cell_width + self.cell_width // 2
+        center_y = row * self.cell_height + self.cell_height // 2
+        radius = cell // 2 - cell * 55 // 133
+        pygame.draw.circle(surface, O_COLOR, (center_x, center_y), radius, max(2, cell * 15 // 133))
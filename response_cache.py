@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """Запрос, который уже выполняется: остальные потоки ждут его результат, а не шлют свой."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """LRU ответов сервера с TTL на каждую запись и склейкой одинаковых одновременных запросов.
+
+    Сколько хранить ответ, решает вызывающий по самому ответу (ttl_for): например, законченную
+    игру — долго, активную — нисколько, "не найдено" — недолго. Исключения не кэшируются.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # ключ -> (значение, срок годности по time.monotonic)
+        self.flights = {}  # ключ -> _Flight
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader, ttl_for):
+        """Значение из кэша или loader(); ttl_for(значение) — секунды хранения, None или 0 — не хранить."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return entry[0]
+                del self.entries[key]
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            # Ошибка в ttl_for — такая же ошибка загрузки: её получат и ждущие потоки
+            ttl = ttl_for(flight.value)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            try:
+                with self.lock:
+                    del self.flights[key]
+                    if flight.error is None:
+                        self._store(key, flight.value, ttl)
+            finally:
+                # Ждущие потоки будятся в любом случае, иначе они зависнут в done.wait()
+                flight.done.set()
+        return flight.value
+
+    def peek(self, key):
+        """Значение из кэша без загрузки или None. Счётчики hits/misses не трогает: они про get_or_load."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+
+    def put(self, key, value, ttl: float | None):
+        """Значение, загруженное в обход get_or_load, например пакетным запросом."""
+        with self.lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl: float | None):
+        if not ttl:
+            return
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"size": len(self.entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                    "coalesced": self.coalesced, "evictions": self.evictions}
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Холодный старт клиента: каждый замер — новый процесс python, как при запуске игры.
+# Время отсчитывается от запуска процесса до вех: интерпретатор готов, ядро (game_core)
+# импортировано, окно (main) импортировано, нарисован первый кадр, ушёл первый запрос к серверу.
+# Сервер — локальная заглушка в процессе бенчмарка или любой адрес из --host.
+
+STAGES = ("python", "import_core", "import_main", "first_frame", "first_request")
+
+
+def probe():
+    """Выполняется в дочернем процессе: замеряет вехи и печатает их одной строкой JSON."""
+    started = float(os.environ["TICK_CROSS_STARTUP_T0"])
+    marks = {"python": time.time() - started}
+    import game_core
+    marks["import_core"] = time.time() - started
+    import main
+    marks["import_main"] = time.time() - started
+
+    from http_client import HttpClient
+    from transport import Transport
+    first_request = threading.Event()
+
+    class ProbeTransport(Transport):
+        def request(self, endpoint: str, params: dict, headers: dict | None = None):
+            if not first_request.is_set():
+                marks["first_request"] = time.time() - started
+                first_request.set()
+            return super().request(endpoint, params, headers)
+
+    host = game_core.SERVER_URL
+    app = main.GameApp(client=HttpClient(host, transport=ProbeTransport(host)), user_id="startup-probe")
+    app.start()
+    app.open_window()
+    while not app.run_frame():
+        pass
+    marks["first_frame"] = time.time() - started
+    first_request.wait(10.0)
+    print(json.dumps(marks))
+
+
+def run_startup_benchmark(runs: int = 10, host: str | None = None) -> dict:
+    """Запускает клиента runs раз с нуля и возвращает p50/min/max каждой вехи в миллисекундах."""
+    from loadtest import percentile
+    from stub_server import start_stub_server
+
+    server = None
+    if host is None:
+        server = start_stub_server()
+        host = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    env = dict(os.environ, TICK_CROSS_SERVER=host, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    # Без настоящего экрана и звука по умолчанию; SDL_VIDEODRIVER из окружения замерит настоящее окно
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    samples = {stage: [] for stage in STAGES}
+    failed = 0
+    try:
+        for _ in range(runs):
+            env["TICK_CROSS_STARTUP_T0"] = repr(time.time())
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe"], env=env,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True,
+                                    text=True, timeout=60)
+            lines = result.stdout.strip().splitlines()
+            if result.returncode != 0 or not lines:
+                failed += 1
+                continue
+            marks = json.loads(lines[-1])
+            for stage in STAGES:
+                if stage in marks:
+                    samples[stage].append(marks[stage])
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    stages = {}
+    for stage, values in samples.items():
+        values.sort()
+        if values:
+            stages[stage] = {"count": len(values), "p50_ms": percentile(values, 50) * 1000,
+                             "min_ms": values[0] * 1000, "max_ms": values[-1] * 1000}
+    return {"host": host, "runs": runs, "failed": failed, "stages": stages}
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Сервер {report['host']}: запусков {report['runs']}, неудачных {report['failed']}",
+             f"{'веха':<16}{'p50, мс':>10}{'min, мс':>10}{'max, мс':>10}"]
+    for stage, row in report["stages"].items():
+        lines.append(f"{stage:<16}{row['p50_ms']:>10.1f}{row['min_ms']:>10.1f}{row['max_ms']:>10.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время холодного старта клиента крестиков-ноликов")
+    parser.add_argument("--runs", type=int, default=10, help="сколько раз запустить клиента")
+    parser.add_argument("--host", default=None, help="адрес сервера; по умолчанию — локальная заглушка")
+    parser.add_argument("--json", action="store_true", help="вывести отчёт в JSON")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe()
+    else:
+        result = run_startup_benchmark(args.runs, args.host)
+        print(json.dumps(result, indent=2) if args.json else format_report(result))
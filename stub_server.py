@@ -0,0 +1,285 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from models import GameStatus
+from board import Board
+
+# Локальный сервер-заглушка с тем же протоколом, что и настоящий бэкенд.
+# Нужен для тестов long-poll/SSE и для запуска клиента без сервера.
+
+BOARD_ROWS = 3
+BOARD_COLS = 3
+WIN_LENGTH = 3
+# Сколько игр можно запросить одним get_games_info
+MAX_BATCH_GAMES = 100
+
+
+class StubGame:
+    def __init__(self, game_id: int, rows: int = BOARD_ROWS, cols: int = BOARD_COLS, win_length: int = WIN_LENGTH):
+        self.game_id = game_id
+        self.status = GameStatus.NEW
+        self.created_at = int(time.time())
+        self.winner_id = None
+        self.players = []  # [(user_id, sign)]
+        self.moves = []
+        self.board = Board(rows, cols, win_length)
+        # Версия заголовков игры: растёт при изменении статуса, победителя или игроков
+        self.version = 1
+
+    def to_game(self) -> dict:
+        return {"game_id": self.game_id, "status": self.status.value,
+                "created_at": self.created_at, "winner_id": self.winner_id}
+
+    def to_users(self) -> list[dict]:
+        return [{"user_id": user_id, "username": user_id, "sign": sign} for user_id, sign in self.players]
+
+    def last_move_id(self) -> int:
+        return self.moves[-1]["move_id"] if self.moves else 0
+
+    def sign_of(self, user_id: str) -> str | None:
+        return next((sign for player_id, sign in self.players if player_id == user_id), None)
+
+    def other_player(self, user_id: str) -> str | None:
+        return next((player_id for player_id, _ in self.players if player_id != user_id), None)
+
+
+class StubState:
+    """Всё состояние сервера; доступ под одним Condition, который будит long-poll и SSE."""
+
+    def __init__(self, rows: int = BOARD_ROWS, cols: int = BOARD_COLS, win_length: int = WIN_LENGTH):
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.games = {}
+        self.active_by_user = {}
+        self.next_game_id = 1
+        self.next_move_id = 1
+        self.changed = threading.Condition()
+
+    def join_game(self, user_id: str) -> dict:
+        with self.changed:
+            game = self.active_by_user.get(user_id)
+            if game is None:
+                game = next((g for g in self.games.values() if g.status == GameStatus.NEW), None)
+                if game is None:
+                    game = StubGame(self.next_game_id, self.rows, self.cols, self.win_length)
+                    self.next_game_id += 1
+                    self.games[game.game_id] = game
+                    game.players.append((user_id, "X"))
+                else:
+                    game.players.append((user_id, "0"))
+                    game.status = GameStatus.ACTIVE
+                    game.version += 1
+                self.active_by_user[user_id] = game
+                self.changed.notify_all()
+            return ok({"game": game.to_game(), "users": game.to_users()})
+
+    def get_game_info(self, game_id: int, after_move_id: int = 0, version: int | None = None) -> dict:
+        with self.changed:
+            game = self.games.get(game_id)
+            if game is None:
+                return error(404, "game not found")
+            body = {"moves": [move for move in game.moves if move["move_id"] > after_move_id], "version": game.version}
+            if version != game.version:
+                body["game"] = game.to_game()
+                body["users"] = game.to_users()
+            return ok(body)
+
+    def get_games_info(self, game_ids: list[int]) -> dict:
+        """Несколько игр одним ответом; у каждой свой status, как у отдельного get_game_info."""
+        if len(game_ids) > MAX_BATCH_GAMES:
+            return error(400, f"too many games, max {MAX_BATCH_GAMES}")
+        return ok({"games": [{"game_id": game_id, **self.get_game_info(game_id)} for game_id in game_ids]})
+
+    def get_active_game_by_user_id(self, user_id: str) -> dict:
+        with self.changed:
+            game = self.active_by_user.get(user_id)
+            if game is None or game.status != GameStatus.ACTIVE:
+                return error(404, "no active game")
+            return ok({"game": game.to_game(), "users": game.to_users(), "moves": list(game.moves), "version": game.version})
+
+    def make_move(self, user_id: str, game_id: int, row: int, col: int, sign: str) -> dict:
+        with self.changed:
+            game = self.games.get(game_id)
+            if game is None or game.status != GameStatus.ACTIVE:
+                return error(400, "game is not active")
+            if game.sign_of(user_id) != sign:
+                return error(400, "wrong sign")
+            expected = "X" if len(game.moves) % 2 == 0 else "0"
+            if sign != expected:
+                return error(400, "not your turn")
+            if not game.board.in_bounds(row, col) or not game.board.is_empty(row, col):
+                return error(400, "cell is not available")
+            move = {"move_id": self.next_move_id, "game_id": game_id, "user_id": user_id,
+                    "row": row, "col": col, "sign": sign, "created_at": int(time.time())}
+            self.next_move_id += 1
+            game.moves.append(move)
+            game.board.apply(row, col, sign)
+            if game.board.winner() == sign:
+                self.finish(game, user_id)
+            elif game.board.is_full():
+                self.finish(game, None)
+            self.changed.notify_all()
+            return ok({"move": move})
+
+    def leave_game(self, user_id: str, game_id: int) -> dict:
+        with self.changed:
+            game = self.games.get(game_id)
+            if game is None or game.sign_of(user_id) is None:
+                return error(404, "game not found")
+            if game.status == GameStatus.ACTIVE:
+                self.finish(game, game.other_player(user_id))
+            elif game.status == GameStatus.NEW:
+                self.finish(game, None)
+            self.active_by_user.pop(user_id, None)
+            self.changed.notify_all()
+            return ok({})
+
+    def finish(self, game: StubGame, winner_id: str | None):
+        game.status = GameStatus.FINISHED
+        game.winner_id = winner_id
+        game.version += 1
+        for user_id, _ in game.players:
+            if self.active_by_user.get(user_id) is game:
+                del self.active_by_user[user_id]
+
+    def wait_game_update(self, game_id: int, after_move_id: int, version: int | None, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        with self.changed:
+            game = self.games.get(game_id)
+            if game is None:
+                return error(404, "game not found")
+
+            def has_update():
+                return game.last_move_id() > after_move_id or (version is not None and game.version != version) \
+                    or game.status == GameStatus.FINISHED
+
+            while not has_update():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.changed.wait(remaining)
+            return ok({"changed": has_update(), "version": game.version, "last_move_id": game.last_move_id()})
+
+
+def ok(body: dict) -> dict:
+    return {"status": 200, "body": body}
+
+
+def error(status: int, message: str) -> dict:
+    return {"status": status, "body": {"error": message}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят разными send(); без TCP_NODELAY keep-alive ответы ждут delayed ACK ~40 мс
+    disable_nagle_algorithm = True
+    state: StubState = None
+    sse_heartbeat = 15.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        endpoint = url.path.strip("/")
+        try:
+            if endpoint == "game_events":
+                self.stream_events(int(query["game_id"]))
+                return
+            response = self.dispatch(endpoint, query)
+        except (KeyError, ValueError) as e:
+            response = error(400, f"bad request: {e}")
+        if response is None:
+            self.send_json(404, {"status": 404, "body": {"error": "unknown endpoint"}})
+            return
+        self.send_json(200, response)
+
+    def dispatch(self, endpoint: str, query: dict) -> dict | None:
+        state = self.state
+        if endpoint == "join_game":
+            return state.join_game(query["user_id"])
+        if endpoint == "get_game_info":
+            version = int(query["version"]) if "version" in query else None
+            return state.get_game_info(int(query["game_id"]), int(query.get("after_move_id", 0)), version)
+        if endpoint == "get_games_info":
+            return state.get_games_info([int(game_id) for game_id in query["game_ids"].split(",") if game_id])
+        if endpoint == "get_active_game_by_user_id":
+            return state.get_active_game_by_user_id(query["user_id"])
+        if endpoint == "make_move":
+            return state.make_move(query["user_id"], int(query["game_id"]), int(query["row"]),
+                                   int(query["col"]), query["sign"])
+        if endpoint == "leave_game":
+            return state.leave_game(query["user_id"], int(query["game_id"]))
+        if endpoint == "wait_game_update":
+            version = int(query["version"]) if "version" in query else None
+            return state.wait_game_update(int(query["game_id"]), int(query.get("after_move_id", 0)), version,
+                                          min(float(query.get("timeout", 25)), 60.0))
+        return None
+
+    def send_json(self, code: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def stream_events(self, game_id: int):
+        state = self.state
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        with state.changed:
+            game = state.games.get(game_id)
+            seen = (game.version, game.last_move_id()) if game is not None else None
+        try:
+            while game is not None:
+                with state.changed:
+                    state.changed.wait_for(lambda: (game.version, game.last_move_id()) != seen, self.sse_heartbeat)
+                    current = (game.version, game.last_move_id())
+                    finished = game.status == GameStatus.FINISHED
+                if current != seen:
+                    seen = current
+                    payload = json.dumps({"version": current[0], "last_move_id": current[1]})
+                    self.wfile.write(f"data: {payload}\n\n".encode("utf-8"))
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+                if finished:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        logging.debug(f"stub_server: {format % args}")
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Запускает сервер в фоновом потоке; адрес — server.server_address, остановка — server.shutdown()."""
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState()})
+    server = ThreadingHTTPServer((host, port), handler, bind_and_activate=False)
+    # Очередь подключений побольше: нагрузочные тесты открывают сотни соединений разом
+    server.request_queue_size = 1024
+    server.allow_reuse_address = True
+    server.server_bind()
+    server.server_activate()
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    server = start_stub_server(port=8000)
+    logging.info(f"Сервер-заглушка запущен на http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
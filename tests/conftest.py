@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Модули клиента лежат в корне репозитория, без пакета
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_server import start_stub_server  # noqa: E402
+
+
+@pytest.fixture
+def stub_server():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_host(stub_server) -> str:
+    return f"http://{stub_server.server_address[0]}:{stub_server.server_address[1]}"
+
+
+@pytest.fixture
+def stub_state(stub_server):
+    return stub_server.RequestHandlerClass.state
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict | None = None, headers: dict | None = None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeTransport:
+    """Транспорт без сети: отдаёт заготовленные ответы по очереди (исключения выбрасывает) и запоминает запросы."""
+
+    pool_size = 1
+
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.calls = []
+        self.timeouts = {}
+
+    def request(self, endpoint: str, params: dict, headers: dict | None = None):
+        self.calls.append((endpoint, dict(params), headers))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def fake_response():
+    return FakeResponse
+
+
+@pytest.fixture
+def fake_transport():
+    return FakeTransport
@@ -0,0 +1,58 @@
+import pytest
+
+from ai import Engine
+from async_client import NetworkLoop
+from board import Board, SIGN_X, SIGN_O
+from game_core import GameCore
+from game_state import State
+from local_client import LocalGameClient
+
+
+def engine_outcomes(engine: Engine, board: Board, engine_sign: str, results: set):
+    """Все исходы партий, где движок отвечает на любые ходы соперника."""
+    if board.winner() is not None or board.is_full():
+        results.add(board.winner())
+        return
+    if board.turn() == engine_sign:
+        row, col = engine.choose_move(board, budget_ms=10_000)
+        assert board.is_empty(row, col)
+        board.apply(row, col, engine_sign)
+        engine_outcomes(engine, board, engine_sign, results)
+        board.undo()
+        return
+    for index in list(board.empty_indexes()):
+        board.apply_index(index, board.turn())
+        engine_outcomes(engine, board, engine_sign, results)
+        board.undo()
+
+
+def test_engine_never_loses_as_x():
+    results = set()
+    engine_outcomes(Engine(seed=1), Board(), SIGN_X, results)
+    assert SIGN_O not in results
+
+
+def test_engine_never_loses_as_o():
+    results = set()
+    engine_outcomes(Engine(seed=1), Board(), SIGN_O, results)
+    assert SIGN_X not in results
+
+
+def test_engine_takes_immediate_win():
+    board = Board()
+    for row, col in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+        board.apply(row, col, board.turn())
+    assert Engine().choose_move(board) == (0, 2)
+
+
+def test_local_client_stays_on_threads_with_asyncio(monkeypatch):
+    # Цикл событий не запускается: с локальным клиентом он не нужен
+    monkeypatch.setattr(NetworkLoop, "start", lambda self: pytest.fail("цикл событий не должен запускаться"))
+    core = GameCore(NetworkLoop(), client=LocalGameClient(budget_ms=50), user_id="alice")
+    assert core.network is None
+    core.prepare()
+    core.start_waiting()
+    for _ in range(3):
+        core.poll_once()
+    assert core.snapshot.state == State.GAME_RUNNING
+    assert len(core.snapshot.players) == 2 and core.snapshot.player.user_id == "alice"
@@ -0,0 +1,100 @@
+import asyncio
+
+from async_client import AsyncConnectionPool, AsyncHttpClient, make_connection_pool
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+async def exchange(raw: bytes):
+    reader = asyncio.StreamReader()
+    reader.feed_data(raw)
+    reader.feed_eof()
+    writer = FakeWriter()
+    response, keep_alive = await AsyncConnectionPool("example", 80)._exchange(reader, writer, "/x?a=1",
+                                                                               {"If-None-Match": '"v1"'})
+    return response, keep_alive, writer.data
+
+
+def test_chunked_and_headers_parsing():
+    raw = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nETag: \"v2\"\r\n\r\n"
+           b"5\r\nhello\r\n6;ext=1\r\n world\r\n0\r\n\r\n")
+    response, keep_alive, sent = asyncio.run(exchange(raw))
+    assert response.status_code == 200 and response.body == b"hello world"
+    assert response.headers["etag"] == '"v2"'
+    assert keep_alive
+    assert sent.startswith(b"GET /x?a=1 HTTP/1.1\r\n") and b"If-None-Match: \"v1\"\r\n" in sent
+
+
+def test_not_modified_without_body_and_connection_close():
+    response, keep_alive, _ = asyncio.run(exchange(b"HTTP/1.1 304 Not Modified\r\n\r\n"))
+    assert response.status_code == 304 and response.body == b"" and keep_alive
+    raw = b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 2\r\n\r\n{}"
+    response, keep_alive, _ = asyncio.run(exchange(raw))
+    assert response.json() == {} and not keep_alive
+
+
+def test_pool_reuses_and_bounds_connections(stub_host):
+    async def run():
+        pool = make_connection_pool(stub_host, size=2)
+        for _ in range(5):
+            assert (await pool.request("/get_game_info?game_id=1")).status_code == 200
+        assert pool.stats()["connections_opened"] == 1
+        responses = await asyncio.gather(*(pool.request("/get_game_info?game_id=1") for _ in range(8)))
+        assert all(response.status_code == 200 for response in responses)
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["requests"] == 13
+    assert stats["connections_opened"] <= 2
+
+
+def test_pool_reconnects_when_idle_connection_was_closed(stub_host):
+    async def run():
+        pool = make_connection_pool(stub_host, size=1)
+        await pool.request("/get_game_info?game_id=1")
+        _, writer = pool._idle[-1]
+        writer.close()
+        response = await pool.request("/get_game_info?game_id=1")
+        await pool.close()
+        return response, pool.stats()
+
+    response, stats = asyncio.run(run())
+    assert response.status_code == 200
+    assert stats["connections_opened"] == 2
+
+
+def test_async_client_plays_and_syncs_deltas(stub_host):
+    async def run():
+        alice, bob = AsyncHttpClient(stub_host), AsyncHttpClient(stub_host)
+        try:
+            game, _ = await alice.join_game("alice")
+            await bob.join_game("bob")
+            game, players, moves = await alice.get_game_updates(game.game_id)
+            assert len(players) == 2 and moves == []
+            signs = {player.user_id: player.sign for player in players}
+            x_user = next(user for user, sign in signs.items() if sign == "X")
+            mover = alice if x_user == "alice" else bob
+            move = await mover.make_move(x_user, game.game_id, 1, 1, "X")
+            assert move is not None and (move.row, move.col) == (1, 1)
+            _, _, moves = await alice.get_game_updates(game.game_id)
+            assert [m.move_id for m in moves] == [move.move_id]
+            _, _, moves = await alice.get_game_updates(game.game_id)
+            assert moves == []
+            assert await alice.make_move(x_user, game.game_id, 1, 1, "X") is None
+            assert (await alice.get_game_info(game.game_id))[2] == [move]
+        finally:
+            await alice.close()
+            await bob.close()
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+import pytest
+
+from board import Board, SIGN_X, SIGN_O
+from render_cache import BoardLayer
+
+
+def play(board: Board, cells: list[tuple[int, int]]):
+    for row, col in cells:
+        board.apply(row, col, board.turn())
+
+
+def test_turn_alternates_starting_with_x():
+    board = Board()
+    assert board.turn() == SIGN_X
+    board.apply(1, 1, SIGN_X)
+    assert board.turn() == SIGN_O
+    board.apply(0, 0, SIGN_O)
+    assert board.turn() == SIGN_X
+
+
+@pytest.mark.parametrize("cells, winner", [
+    ([(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)], SIGN_X),  # строка
+    ([(0, 0), (0, 1), (1, 0), (1, 1), (2, 2), (2, 1)], SIGN_O),  # столбец
+    ([(0, 0), (0, 1), (1, 1), (0, 2), (2, 2)], SIGN_X),  # диагональ
+    ([(0, 2), (0, 0), (1, 1), (0, 1), (2, 0)], SIGN_X),  # обратная диагональ
+])
+def test_winner(cells, winner):
+    board = Board()
+    play(board, cells)
+    assert board.winner() == winner
+    assert board.find_winner() == winner
+
+
+def test_draw_has_no_winner():
+    board = Board()
+    play(board, [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)])
+    assert board.is_full()
+    assert board.winner() is None
+
+
+def test_undo_and_clear_restore_state():
+    board = Board()
+    play(board, [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)])
+    board.undo()
+    assert board.winner() is None
+    assert board.is_empty(0, 2)
+    board.place(0, 2, SIGN_X)
+    board.clear(0, 2)
+    assert board.winner() is None
+    assert board.turn() == SIGN_X
+
+
+def test_win_length_on_larger_board():
+    board = Board(5, 5, 4)
+    play(board, [(0, 0), (4, 4), (0, 1), (4, 3), (0, 2)])
+    assert board.winner() is None
+    play(board, [(3, 3), (0, 3)])
+    assert board.winner() == SIGN_X
+
+
+def test_copy_is_independent():
+    board = Board()
+    board.apply(0, 0, SIGN_X)
+    copy = board.copy()
+    copy.apply(1, 1, SIGN_O)
+    assert board.is_empty(1, 1)
+    assert not copy.is_empty(1, 1)
+
+
+def test_board_layer_maps_clicks_on_non_square_board():
+    layer = BoardLayer(400, 3, 4, (0, 0, 0))
+    assert layer.cell_at(399, 10) == (0, 3)
+    assert layer.cell_at(10, 399) == (2, 0)
+    assert layer.cell_at(150, 150) == (1, 1)
+    assert layer.cell_at(410, 10) is None
+    board = Board(3, 4, 3)
+    board.apply(2, 3, "X")
+    assert layer.render(board) is layer.render(board.copy())
+    assert layer.redraws == 1
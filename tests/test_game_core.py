@@ -0,0 +1,29 @@
+import pytest
+
+import game_core
+
+
+def test_empty_user_file_is_an_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / game_core.user_file_name).write_text("  \n")
+    with pytest.raises(ValueError):
+        game_core.load_user_id()
+
+
+def test_user_id_is_read_when_the_core_is_created(tmp_path, monkeypatch, stub_host):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / game_core.user_file_name).write_text("alice\n")
+    core = game_core.GameCore(client=game_core.HttpClient(stub_host))
+    assert core.user_id == "alice"
+
+
+def test_poll_after_leaving_to_menu_does_nothing(stub_host):
+    core = game_core.GameCore(client=game_core.HttpClient(stub_host), user_id="alice")
+    core.prepare()
+    core.start_waiting()
+    assert core.poll_once()
+    assert core.snapshot.game is not None
+    # ESC, пока поток опроса ждал в канале обновлений
+    core.reset_game()
+    assert core.poll_once() is False
+    assert core.snapshot.state == game_core.State.MENU
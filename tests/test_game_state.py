@@ -0,0 +1,53 @@
+from board import Board
+from game_state import State, initial_snapshot, next_snapshot
+from models import Game, GameStatus, Player
+
+PLAYERS = (Player("alice", "Alice", "X"), Player("bob", "Bob", "0"))
+ACTIVE = Game(1, GameStatus.ACTIVE, 0)
+
+
+def running(user_id: str, board: Board | None = None):
+    snapshot = initial_snapshot(Board())
+    return next_snapshot(snapshot, user_id, state=State.GAME_RUNNING, game=ACTIVE, players=PLAYERS,
+                         board=board if board is not None else Board())
+
+
+def test_version_grows_and_previous_snapshot_is_unchanged():
+    first = initial_snapshot(Board())
+    second = next_snapshot(first, None, state=State.GAME_WAITING, waiting_start_time=10.0)
+    assert (first.version, second.version) == (0, 1)
+    assert first.state == State.MENU and second.waiting_start_time == 10.0
+
+
+def test_player_enemy_and_turn():
+    alice, bob = running("alice"), running("bob")
+    assert (alice.player, alice.enemy) == PLAYERS
+    assert (bob.player, bob.enemy) == PLAYERS[::-1]
+    assert alice.can_make_move and not bob.can_make_move
+    board = Board()
+    board.apply(0, 0, "X")
+    assert not running("alice", board).can_make_move
+    assert running("bob", board).can_make_move
+
+
+def test_no_move_after_win_or_for_spectator():
+    board = Board()
+    for row, col in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+        board.apply(row, col, board.turn())
+    assert not running("bob", board).can_make_move
+    spectator = running("carol")
+    assert spectator.player is None and not spectator.can_make_move
+
+
+def test_waiting_with_one_player_has_no_sides():
+    snapshot = next_snapshot(initial_snapshot(Board()), "alice", state=State.GAME_WAITING, game=ACTIVE,
+                             players=PLAYERS[:1], waiting_start_time=5.0)
+    assert snapshot.player is None and snapshot.enemy is None and not snapshot.can_make_move
+    assert snapshot.waiting_start_time == 5.0
+
+
+def test_finished_game_switches_state_and_drops_timer():
+    snapshot = running("alice")._replace(waiting_start_time=5.0)
+    finished = next_snapshot(snapshot, "alice", game=ACTIVE._replace(status=GameStatus.FINISHED))
+    assert finished.state == State.GAME_FINISHED
+    assert not finished.can_make_move and finished.waiting_start_time is None
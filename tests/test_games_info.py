@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from async_client import AsyncHttpClient
+from http_client import GameInfoError, HttpClient
+from metrics import Metrics
+from models import GameStatus
+
+
+def two_games(stub_state):
+    """Игра 1 идёт, игра 2 закончена: второй игрок вышел."""
+    for user_id in ("a", "b", "c", "d"):
+        stub_state.join_game(user_id)
+    stub_state.make_move("a", 1, 0, 0, "X")
+    stub_state.leave_game("d", 2)
+
+
+@pytest.fixture(params=[True, False], ids=["batch", "one_by_one"])
+def batch_supported(request, stub_server):
+    if not request.param:
+        # Старый сервер: эндпоинта get_games_info нет, клиент должен перейти на запросы по одной игре
+        handler = stub_server.RequestHandlerClass
+        dispatch = handler.dispatch
+        handler.dispatch = lambda self, endpoint, query: None if endpoint == "get_games_info" \
+            else dispatch(self, endpoint, query)
+    return request.param
+
+
+def check_results(results):
+    assert list(results) == [2, 1, 99]
+    game, players, moves = results[1]
+    assert game.status == GameStatus.ACTIVE and len(players) == 2 and len(moves) == 1
+    assert results[2][0].status == GameStatus.FINISHED
+    assert isinstance(results[99], GameInfoError) and results[99].status == 404
+
+
+def test_get_games_info(stub_host, stub_state, batch_supported):
+    two_games(stub_state)
+    client = HttpClient(stub_host, metrics=Metrics())
+    check_results(client.get_games_info([2, 1, 99, 1]))
+    assert client.batch_supported == batch_supported
+    # Законченная игра берётся из кэша, идущая — запрашивается заново
+    assert client.cache.peek(("get_game_info", 2)) is not None
+    assert client.cache.peek(("get_game_info", 1)) is None
+    client.close()
+
+
+def test_get_games_info_does_not_touch_sync_state(stub_host, stub_state):
+    two_games(stub_state)
+    client = HttpClient(stub_host, metrics=Metrics())
+    client.get_games_info([1])
+    assert client.game_syncs == {}
+    _, _, moves = client.get_game_updates(1)
+    assert [m.move_id for m in moves] == [1]
+    client.close()
+
+
+def test_async_get_games_info(stub_host, stub_state, batch_supported):
+    two_games(stub_state)
+
+    async def run():
+        client = AsyncHttpClient(stub_host)
+        try:
+            return client, await client.get_games_info([2, 1, 99, 1])
+        finally:
+            await client.close()
+
+    client, results = asyncio.run(run())
+    check_results(results)
+    assert client.batch_supported == batch_supported
+    assert client.game_syncs == {}
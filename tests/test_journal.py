@@ -0,0 +1,74 @@
+import os
+
+from journal import GameJournal, GAMES_FILE, MOVES_FILE, analyze
+from models import Game, GameStatus, Move, Player
+
+PLAYERS = [Player("alice", "Alice", "X"), Player("bob", "Bob", "0")]
+
+
+def finished_game(game_id: int, cells: list[tuple[int, int]], winner_id: str | None) -> tuple[Game, list[Move]]:
+    moves = []
+    for ply, (row, col) in enumerate(cells):
+        player = PLAYERS[ply % 2]
+        moves.append(Move(game_id * 100 + ply, game_id, player.user_id, row, col, player.sign, 1000 + ply))
+    return Game(game_id, GameStatus.FINISHED, 1000, winner_id), moves
+
+
+X_WINS = [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]
+DRAW = [(0, 0), (0, 1), (0, 2), (1, 1), (1, 0), (1, 2), (2, 1), (2, 0), (2, 2)]
+
+
+def test_round_trip_and_replay(tmp_path):
+    journal = GameJournal(str(tmp_path))
+    game, moves = finished_game(1, X_WINS, "alice")
+    assert journal.record_game(game, PLAYERS, moves, 3, 3, 3)
+    # Повторная запись той же игры игнорируется
+    assert not journal.record_game(game, PLAYERS, moves, 3, 3, 3)
+    draw, draw_moves = finished_game(2, DRAW, None)
+    assert journal.record_game(draw, PLAYERS, draw_moves, 3, 3, 3)
+    journal.close()
+
+    journal = GameJournal(str(tmp_path))
+    assert journal.moves(1) == moves
+    assert journal.moves(2) == draw_moves
+    record = journal.game(1)
+    assert (record.x_user, record.o_user, record.winner_id, record.move_count) == ("alice", "bob", "alice", 5)
+    assert journal.replay(1).winner() == "X"
+    assert journal.replay(2).is_full() and journal.replay(2).winner() is None
+    partial = journal.replay(1, ply=2)
+    assert partial.get(0, 0) == "X" and partial.get(1, 0) == "0" and partial.is_empty(0, 1)
+    assert [r.game_id for r in journal.games_of_user("bob")] == [1, 2]
+    assert journal.game(3) is None and journal.moves(3) == []
+
+    stats = analyze(journal)
+    assert stats["games"] == 2 and stats["moves"] == 14
+    journal.close()
+
+
+def test_partial_tail_record_is_dropped(tmp_path):
+    journal = GameJournal(str(tmp_path))
+    game, moves = finished_game(1, X_WINS, "alice")
+    journal.record_game(game, PLAYERS, moves, 3, 3, 3)
+    journal.close()
+    for name in (GAMES_FILE, MOVES_FILE):
+        with open(os.path.join(tmp_path, name), "ab") as file:
+            file.write(b"\x01\x02\x03")
+
+    journal = GameJournal(str(tmp_path))
+    assert journal.moves(1) == moves
+    second, second_moves = finished_game(2, DRAW, None)
+    journal.record_game(second, PLAYERS, second_moves, 3, 3, 3)
+    assert journal.moves(2) == second_moves
+    journal.close()
+
+
+def test_opening_beyond_one_byte(tmp_path):
+    journal = GameJournal(str(tmp_path))
+    game = Game(1, GameStatus.FINISHED, 1000, None)
+    moves = [Move(1, 1, "alice", 15, 15, "X", 1000)]
+    journal.record_game(game, PLAYERS, moves, 16, 16, 5)
+    journal.record_game(Game(2, GameStatus.FINISHED, 1000, "bob"), PLAYERS, [], 16, 16, 5)
+    assert journal.game(1).opening == (15, 15)
+    assert journal.game(2).opening is None
+    assert analyze(journal)["openings"] == {"255": {"games": 1, "x_wins": 0, "o_wins": 0, "draws": 1}}
+    journal.close()
@@ -0,0 +1,72 @@
+import json
+
+from http_client import HttpClient
+from metrics import Histogram, Metrics
+
+
+def counter(metrics: Metrics, endpoint: str, outcome: str) -> int:
+    return metrics.counters.get(("http_requests_total", (("endpoint", endpoint), ("outcome", outcome))), 0)
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    metrics.inc("x")
+    metrics.observe("y", 0.1)
+    assert metrics.snapshot() == {"counters": [], "histograms": []}
+
+
+def test_histogram_percentiles_by_bucket():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for value in [0.005] * 98 + [0.5, 5.0]:
+        histogram.observe(value)
+    assert histogram.percentile(50) == 0.01
+    assert histogram.percentile(99) == 1.0
+    assert histogram.percentile(100) == float("inf")
+    assert Histogram().percentile(50) is None
+
+
+def test_prometheus_text_format():
+    metrics = Metrics(enabled=True)
+    metrics.describe("requests_total", "Запросы")
+    metrics.inc("requests_total", {"endpoint": 'a"b'}, 2)
+    metrics.observe("seconds", 0.003)
+    metrics.observe("seconds", 0.2)
+    text = metrics.to_prometheus()
+    assert "# HELP tick_cross_requests_total Запросы\n# TYPE tick_cross_requests_total counter\n" in text
+    assert 'tick_cross_requests_total{endpoint="a\\"b"} 2\n' in text
+    assert 'tick_cross_seconds_bucket{le="0.004"} 1\n' in text
+    assert 'tick_cross_seconds_bucket{le="+Inf"} 2\n' in text
+    assert "tick_cross_seconds_count 2\n" in text
+
+
+def test_export_json_and_text(tmp_path):
+    metrics = Metrics(enabled=True, export_path=str(tmp_path / "metrics.prom"))
+    metrics.inc("requests_total")
+    assert metrics.export() == str(tmp_path / "metrics.prom")
+    assert "tick_cross_requests_total 1" in (tmp_path / "metrics.prom").read_text()
+    path = metrics.export(str(tmp_path / "metrics.json"))
+    with open(path) as file:
+        assert json.load(file)["counters"] == [{"name": "requests_total", "labels": {}, "value": 1}]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics.json", "metrics.prom"]
+
+
+def test_http_client_counts_outcomes(stub_host, stub_state):
+    stub_state.join_game("a")
+    metrics = Metrics(enabled=True)
+    client = HttpClient(stub_host, metrics=metrics)
+    assert client.get_game_info(1) is not None
+    assert client.get_game_info(99) is None
+    assert counter(metrics, "get_game_info", "ok") == 1
+    assert counter(metrics, "get_game_info", "error") == 1
+    assert metrics.histograms[("http_request_seconds", (("endpoint", "get_game_info"),))].count == 2
+    client.close()
+
+
+def test_undecodable_response_counts_as_exception(fake_response, fake_transport):
+    html = fake_response(200)
+    html.content = b"<html>502 Bad Gateway</html>"
+    metrics = Metrics(enabled=True)
+    client = HttpClient("http://stub", transport=fake_transport([html]), metrics=metrics)
+    assert client.get_game_info(1) is None
+    assert counter(metrics, "get_game_info", "exception") == 1
+    assert counter(metrics, "get_game_info", "ok") == 0
@@ -0,0 +1,57 @@
+import pytest
+
+from models import (GameStatus, Move, Player, decode_game_body, decode_game_payload, decode_moves, decode_players)
+
+
+def move_dict(move_id: int, **changes) -> dict:
+    data = {"move_id": move_id, "game_id": 1, "user_id": "a", "row": 0, "col": move_id % 3, "sign": "X",
+            "created_at": 100}
+    data.update(changes)
+    return data
+
+
+def test_fast_path_matches_from_dict():
+    moves = [move_dict(i) for i in range(1, 6)]
+    assert decode_moves(moves) == [Move.from_dict(m) for m in moves]
+    assert [m.move_id for m in decode_moves(moves, after_move_id=3)] == [4, 5]
+
+
+def test_numeric_strings_and_zero_sign_are_coerced():
+    moves = decode_moves([move_dict(1), move_dict(2, row="2", sign=0)])
+    assert moves[1].row == 2 and moves[1].sign == "0"
+    players = decode_players([{"user_id": "a", "username": "A", "sign": 0}])
+    assert players == [Player("a", "A", "0")]
+
+
+@pytest.mark.parametrize("changes", [
+    {"row": 1.9},
+    {"col": True},
+    {"created_at": None},
+    {"row": "один"},
+    {"sign": "Y"},
+])
+def test_bad_field_types_are_rejected(changes):
+    with pytest.raises(ValueError):
+        decode_moves([move_dict(1), move_dict(2, **changes)])
+
+
+def test_missing_field_is_rejected():
+    data = move_dict(1)
+    del data["row"]
+    with pytest.raises(ValueError):
+        decode_moves([data])
+
+
+def test_bad_player_sign_is_rejected():
+    with pytest.raises(ValueError):
+        decode_players([{"user_id": "a", "username": "A", "sign": "Y"}])
+
+
+def test_game_payload_round_trip():
+    body = {"game": {"game_id": 1, "status": "active", "created_at": 5, "winner_id": None},
+            "users": [{"user_id": "a", "username": "A", "sign": "X"}], "moves": [move_dict(1)], "version": 3}
+    payload = decode_game_body(body)
+    assert payload.game.status == GameStatus.ACTIVE
+    assert payload.version == 3 and len(payload.moves) == 1
+    error = decode_game_payload(b'{"status": 404, "body": {}}')
+    assert error.status == 404 and error.game is None and error.moves == []
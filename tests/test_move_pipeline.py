@@ -0,0 +1,74 @@
+import threading
+import time
+
+import game_core
+from move_pipeline import MovePipeline
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось"
+        time.sleep(0.01)
+
+
+def test_failed_send_is_resolved_as_rejected():
+    results = []
+    done = threading.Event()
+
+    def send(pending):
+        if pending.row == 1:
+            raise ConnectionError("нет сети")
+        return None
+
+    def on_result(pending, move):
+        results.append((pending.row, move))
+        if len(results) == 2:
+            done.set()
+
+    pipeline = MovePipeline(send, on_result)
+    pipeline.submit(1, 0, 0, "X")
+    pipeline.submit(1, 1, 1, "X")
+    assert done.wait(5)
+    assert results == [(0, None), (1, None)]
+    assert pipeline.snapshot() == []
+
+
+def running_core(stub_host, stub_state) -> game_core.GameCore:
+    core = game_core.GameCore(client=game_core.HttpClient(stub_host), user_id="alice")
+    core.prepare()
+    core.start_waiting()
+    core.poll_once()
+    stub_state.join_game("bob")
+    core.poll_once()
+    assert core.snapshot.state == game_core.State.GAME_RUNNING
+    return core
+
+
+def test_rejected_move_is_rolled_back_and_resynced(stub_host, stub_state, monkeypatch):
+    core = running_core(stub_host, stub_state)
+    wakes = []
+    monkeypatch.setattr(core.http_client, "make_move", lambda *args: None)
+    monkeypatch.setattr(core, "wake_poller", lambda: wakes.append(1))
+    sign = core.snapshot.player.sign
+    assert core.play_cell(0, 0)
+    assert core.snapshot.board.get(0, 0) == sign
+    wait_until(lambda: wakes)
+    assert core.snapshot.board.get(0, 0) is None
+    assert core.resync_requested
+    # Полный снимок забирает поток опроса, а не поток отправки ходов
+    core.poll_once()
+    assert not core.resync_requested
+
+
+def test_moves_already_in_snapshot_are_not_duplicated(stub_host, stub_state):
+    core = running_core(stub_host, stub_state)
+    x_user = next(p.user_id for p in core.snapshot.players if p.sign == "X")
+    stub_state.make_move(x_user, core.snapshot.game.game_id, 1, 1, "X")
+    core.resync_requested = True
+    core.poll_once()
+    snapshot = core.snapshot
+    assert len(snapshot.moves) == 1
+    # Дельта, запрошенная до полного снимка, приходит позже него
+    assert not core.handle_game_updates((snapshot.game, list(snapshot.players), list(snapshot.moves)))
+    assert core.snapshot.moves == snapshot.moves
@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+
+import response_cache
+from http_client import HttpClient
+from metrics import Metrics
+from response_cache import ResponseCache
+
+
+def run_threads(count: int, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_concurrent_loads_are_coalesced():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threading.Timer(0.2, release.set).start()
+    run_threads(5, lambda: results.append(cache.get_or_load("key", loader, lambda value: 60)))
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 4
+
+
+def test_loader_error_reaches_waiters_and_is_not_cached():
+    cache = ResponseCache()
+    release = threading.Event()
+
+    def loader():
+        release.wait(5)
+        raise KeyError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load("key", loader, lambda value: 60)
+        except KeyError as e:
+            errors.append(e)
+
+    threading.Timer(0.2, release.set).start()
+    run_threads(3, call)
+    assert len(errors) == 3
+    assert cache.get_or_load("key", lambda: "ok", lambda value: 60) == "ok"
+
+
+def test_ttl_for_error_does_not_hang_waiters():
+    cache = ResponseCache()
+    release = threading.Event()
+
+    def ttl_for(value):
+        raise ValueError("unexpected payload")
+
+    def loader():
+        release.wait(5)
+        return "value"
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load("key", loader, ttl_for)
+        except ValueError as e:
+            errors.append(e)
+
+    threading.Timer(0.2, release.set).start()
+    run_threads(3, call)
+    assert len(errors) == 3
+
+
+def test_ttl_expiry_and_no_store(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache()
+    assert cache.get_or_load("a", lambda: 1, lambda value: 10) == 1
+    assert cache.get_or_load("a", lambda: 2, lambda value: 10) == 1
+    now[0] += 11
+    assert cache.get_or_load("a", lambda: 3, lambda value: 10) == 3
+    # ttl None — не хранить
+    assert cache.get_or_load("b", lambda: 1, lambda value: None) == 1
+    assert cache.get_or_load("b", lambda: 2, lambda value: None) == 2
+    assert cache.peek("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 4)
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_size=2)
+    for key in "abc":
+        cache.get_or_load(key, lambda key=key: key, lambda value: 60)
+    assert cache.peek("a") is None
+    assert cache.peek("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("ttl", [0, None])
+def test_put_without_ttl_is_ignored(ttl):
+    cache = ResponseCache()
+    cache.put("key", "value", ttl)
+    assert cache.peek("key") is None
+
+
+def test_http_client_caches_only_finished_and_missing_games(stub_host, stub_state):
+    for user_id in ("a", "b"):
+        stub_state.join_game(user_id)
+    client = HttpClient(stub_host, metrics=Metrics())
+    client.get_game_info(1)
+    client.get_game_info(1)
+    assert client.cache.stats()["hits"] == 0
+    stub_state.leave_game("b", 1)
+    finished = client.get_game_info(1)
+    assert client.get_game_info(1) == finished
+    assert client.get_game_info(99) is None
+    assert client.get_game_info(99) is None
+    assert client.cache.stats()["hits"] == 2
+    client.close()
@@ -0,0 +1,58 @@
+from http_client import HttpClient
+from metrics import Metrics
+
+
+GAME = {"game_id": 7, "status": 1, "created_at": 1, "winner_id": None}
+USERS = [{"user_id": "a", "username": "a", "sign": "X"}, {"user_id": "b", "username": "b", "sign": "0"}]
+
+
+def move(move_id: int, row: int, col: int, sign: str) -> dict:
+    return {"move_id": move_id, "game_id": 7, "user_id": "a" if sign == "X" else "b", "row": row, "col": col,
+            "sign": sign, "created_at": 1}
+
+
+def test_delta_sync_against_stub(stub_host, stub_state):
+    stub_state.join_game("a")
+    stub_state.join_game("b")
+    client = HttpClient(stub_host, metrics=Metrics())
+    game, players, moves = client.get_game_updates(1)
+    assert len(players) == 2 and moves == []
+    assert client.sync_point(1) == (0, 2)
+
+    stub_state.make_move("a", 1, 0, 0, "X")
+    stub_state.make_move("b", 1, 1, 1, "0")
+    _, _, moves = client.get_game_updates(1)
+    assert [m.move_id for m in moves] == [1, 2]
+    assert client.sync_point(1)[0] == 2
+
+    stub_state.make_move("a", 1, 2, 2, "X")
+    game, players, moves = client.get_game_updates(1)
+    assert [m.move_id for m in moves] == [3]
+    # Заголовки не менялись: сервер их опустил, клиент подставил сохранённые
+    assert game.game_id == 1 and len(players) == 2
+    client.close()
+
+
+def test_delta_sync_sends_etag_and_handles_304(fake_response, fake_transport):
+    transport = fake_transport([
+        fake_response(200, {"status": 200, "body": {"game": GAME, "users": USERS, "moves": [move(1, 0, 0, "X")],
+                                                   "version": 3}}, {"ETag": '"v3-1"'}),
+        fake_response(304),
+        fake_response(200, {"status": 200, "body": {"moves": [move(1, 0, 0, "X"), move(2, 1, 1, "0")],
+                                                   "version": 3}}, {"ETag": '"v3-2"'}),
+    ])
+    client = HttpClient("http://stub", transport=transport, metrics=Metrics())
+
+    _, _, moves = client.get_game_updates(7)
+    assert [m.move_id for m in moves] == [1]
+
+    game, players, moves = client.get_game_updates(7)
+    assert moves == [] and game.game_id == 7 and len(players) == 2
+    assert transport.calls[1][1] == {"game_id": 7, "after_move_id": 1, "version": 3}
+    assert transport.calls[1][2] == {"If-None-Match": '"v3-1"'}
+
+    # Сервер, который after_move_id игнорирует: старые ходы отбрасываются клиентом
+    _, _, moves = client.get_game_updates(7)
+    assert [m.move_id for m in moves] == [2]
+    assert transport.calls[2][2] == {"If-None-Match": '"v3-1"'}
+    assert client.game_syncs[7].etag == '"v3-2"'
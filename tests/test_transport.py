@@ -0,0 +1,75 @@
+import time
+
+import pytest
+import requests
+
+from transport import Transport
+
+
+@pytest.fixture
+def server_plan(stub_server, monkeypatch):
+    """Управляет заглушкой: сколько ближайших ответов будут 503 и с какой задержкой отвечать."""
+    handler = stub_server.RequestHandlerClass
+    plan = {"fail": 0, "delay": 0.0, "paths": []}
+    do_get = handler.do_GET
+
+    def patched(self):
+        plan["paths"].append(self.path)
+        time.sleep(plan["delay"])
+        if plan["fail"] > 0:
+            plan["fail"] -= 1
+            self.send_json(503, {"status": 503, "body": {"error": "overloaded"}})
+            return
+        do_get(self)
+
+    monkeypatch.setattr(handler, "do_GET", patched)
+    return plan
+
+
+def test_idempotent_request_is_retried(stub_host, stub_state, server_plan):
+    stub_state.join_game("a")
+    transport = Transport(stub_host, backoff_base=0.0)
+    server_plan["fail"] = 2
+    response = transport.request("get_game_info", {"game_id": 1})
+    assert response.status_code == 200
+    stats = transport.stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (3, 2, 0)
+    transport.close()
+
+
+def test_retries_are_bounded(stub_host, server_plan):
+    transport = Transport(stub_host, max_retries=1, backoff_base=0.0)
+    server_plan["fail"] = 5
+    assert transport.request("get_game_info", {"game_id": 1}).status_code == 503
+    assert len(server_plan["paths"]) == 2
+    transport.close()
+
+
+@pytest.mark.parametrize("endpoint", ["join_game", "make_move", "leave_game"])
+def test_state_changing_request_is_not_retried(stub_host, server_plan, endpoint):
+    transport = Transport(stub_host, backoff_base=0.0)
+    server_plan["fail"] = 1
+    assert transport.request(endpoint, {"user_id": "a"}).status_code == 503
+    assert len(server_plan["paths"]) == 1
+    assert transport.stats()["retries"] == 0
+    transport.close()
+
+
+def test_read_timeout_per_endpoint(stub_host, server_plan):
+    transport = Transport(stub_host, max_retries=1, backoff_base=0.0, timeouts={"get_game_info": (1.0, 0.1)})
+    server_plan["delay"] = 0.5
+    with pytest.raises(requests.Timeout):
+        transport.request("get_game_info", {"game_id": 1})
+    stats = transport.stats()
+    assert (stats["timeouts"], stats["failures"]) == (2, 1)
+    transport.close()
+
+
+def test_connections_are_kept_alive(stub_host):
+    transport = Transport(stub_host, pool_size=2)
+    for _ in range(10):
+        transport.request("get_game_info", {"game_id": 1})
+    stats = transport.stats()
+    assert stats["requests"] == 10
+    assert stats["connections_opened"] == 1
+    transport.close()
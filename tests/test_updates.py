@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from transport import Transport
+from updates import AdaptivePollChannel, LongPollChannel, UpdateChannel
+
+
+def make_channel(transport):
+    channel = LongPollChannel(transport, hold=1.0)
+    fallback_waits = []
+    channel.fallback.wait = lambda *args: fallback_waits.append(args)
+    return channel, fallback_waits
+
+
+def test_update_channel_requires_wait():
+    with pytest.raises(TypeError):
+        UpdateChannel()
+
+
+def test_adaptive_poll_never_faster_than_the_old_loop():
+    channel = AdaptivePollChannel()
+    for _ in range(10):
+        channel.report(False)
+    assert channel.interval == channel.max_interval
+    channel.report(True)
+    assert channel.interval == 0.5
+    channel.report(False)
+    channel.notify_local_move()
+    assert channel.interval == 0.5
+
+
+@pytest.mark.parametrize("outcome", [
+    (503, {"status": 503, "body": {}}),
+    (502, None),
+    (200, {"status": 500, "body": {"error": "boom"}}),
+    requests.ConnectionError("refused"),
+])
+def test_long_poll_backs_off_on_errors(outcome, fake_response, fake_transport):
+    response = outcome if isinstance(outcome, Exception) else fake_response(*outcome)
+    channel, fallback_waits = make_channel(fake_transport([response]))
+    channel.wait(1, 0, 1)
+    assert fallback_waits == [(1, 0, 1)]
+    assert channel.supported
+
+
+def test_long_poll_returns_at_once_on_update(fake_response, fake_transport):
+    transport = fake_transport([fake_response(200, {"status": 200, "body": {"changed": True}})])
+    channel, fallback_waits = make_channel(transport)
+    channel.wait(1, 0, 1)
+    assert fallback_waits == []
+    assert transport.calls[0][1] == {"game_id": 1, "after_move_id": 0, "version": 1, "timeout": 1.0}
+
+
+def test_long_poll_switches_to_polling_on_404(fake_response, fake_transport):
+    transport = fake_transport([fake_response(404)])
+    channel, fallback_waits = make_channel(transport)
+    channel.wait(1, 0, 1)
+    assert not channel.supported
+    channel.wait(1, 0, 1)
+    assert len(transport.calls) == 1
+    assert len(fallback_waits) == 1
+
+
+def test_long_poll_polls_until_version_is_known(fake_transport):
+    transport = fake_transport([])
+    channel, fallback_waits = make_channel(transport)
+    channel.wait(1, 0, None)
+    assert transport.calls == []
+    assert len(fallback_waits) == 1
+
+
+def test_long_poll_against_stub_wakes_on_move(stub_host, stub_state):
+    stub_state.join_game("a")
+    stub_state.join_game("b")
+    transport = Transport(stub_host)
+    channel = LongPollChannel(transport, hold=5.0)
+    version = stub_state.games[1].version
+    threading.Timer(0.2, stub_state.make_move, ("a", 1, 0, 0, "X")).start()
+    start = time.monotonic()
+    channel.wait(1, 0, version)
+    assert time.monotonic() - start < 3.0
+    transport.close()
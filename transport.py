@@ -0,0 +1,110 @@
+import logging
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Таймауты (connect, read) в секундах для каждого эндпоинта
+DEFAULT_TIMEOUT = (1.0, 5.0)
+ENDPOINT_TIMEOUTS = {
+    "get_active_game_by_user_id": (1.0, 3.0),
+    "get_game_info": (1.0, 3.0),
+    "get_games_info": (1.0, 5.0),
+    "join_game": (1.0, 5.0),
+    "make_move": (1.0, 5.0),
+    "leave_game": (1.0, 3.0),
+}
+
+# Повторять можно только идемпотентные запросы: join_game, make_move и leave_game меняют состояние сервера
+IDEMPOTENT_ENDPOINTS = {"get_active_game_by_user_id", "get_game_info", "get_games_info"}
+
+# HTTP-коды, при которых имеет смысл повторить запрос
+RETRY_STATUS_CODES = {502, 503, 504}
+
+
+class Transport:
+    """Общая keep-alive сессия с ограниченным пулом соединений, таймаутами и повторами."""
+
+    def __init__(self, host: str, pool_size: int = 4, max_retries: int = 2,
+                 backoff_base: float = 0.1, backoff_max: float = 2.0, timeouts: dict | None = None):
+        self.host = host
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts is not None:
+            self.timeouts.update(timeouts)
+
+        # pool_block=True: при исчерпании пула ждём свободное соединение, а не открываем лишнее
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+        self._timeouts = 0
+
+    def request(self, endpoint: str, params: dict, headers: dict | None = None) -> requests.Response:
+        url = f"{self.host}/{endpoint}"
+        timeout = self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+        attempts = 1 + (self.max_retries if endpoint in IDEMPOTENT_ENDPOINTS else 0)
+        for attempt in range(attempts):
+            self._count(sent=1, retries=1 if attempt > 0 else 0)
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except requests.Timeout:
+                self._count(timeouts=1)
+                if attempt + 1 == attempts:
+                    self._count(failures=1)
+                    raise
+            except requests.ConnectionError:
+                if attempt + 1 == attempts:
+                    self._count(failures=1)
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt + 1 == attempts:
+                    return response
+            self._sleep_backoff(attempt)
+            logging.info(f"Повтор запроса {endpoint} (попытка {attempt + 2} из {attempts})")
+
+    def _sleep_backoff(self, attempt: int):
+        # Полный джиттер, чтобы клиенты не повторяли запросы синхронно
+        time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    def _count(self, sent: int = 0, retries: int = 0, failures: int = 0, timeouts: int = 0):
+        with self._stats_lock:
+            self._requests += sent
+            self._retries += retries
+            self._failures += failures
+            self._timeouts += timeouts
+
+    def stats(self) -> dict:
+        opened, served, idle = 0, 0, 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            served += pool.num_requests
+            if pool.pool is not None:
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+        with self._stats_lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "timeouts": self._timeouts,
+                "connections_opened": opened,
+                "connections_idle": idle,
+                "pooled_requests": served,
+                "pool_size": self.pool_size,
+            }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,188 @@
+import abc
+import json
+import logging
+import threading
+import requests
+from transport import Transport
+
+# Сколько сервер держит long-poll запрос, прежде чем ответить "ничего не изменилось"
+LONG_POLL_HOLD = 25.0
+# Если по SSE долго нет событий, всё равно делаем контрольный запрос
+SSE_HEARTBEAT = 15.0
+
+
+class UpdateChannel(abc.ABC):
+    """Источник сигналов "на сервере что-то изменилось" для цикла GameApp.get_info.
+
+    wait() блокирует, пока не появится повод спросить сервер, report() сообщает,
+    изменилось ли что-то на самом деле, notify_local_move() — что мы только что сходили.
+    """
+
+    @abc.abstractmethod
+    def wait(self, game_id: int | None, after_move_id: int, version: int | None = None):
+        pass
+
+    def report(self, changed: bool):
+        pass
+
+    def notify_local_move(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class AdaptivePollChannel(UpdateChannel):
+    """Опрос с переменным интервалом: реже, пока ничего не меняется, и сразу чаще после нашего хода.
+
+    Чаще прежнего фиксированного опроса (0.5 с) не спрашиваем даже во время активной игры.
+    """
+
+    def __init__(self, min_interval: float = 0.5, max_interval: float = 3.0, factor: float = 1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+        self._wake = threading.Event()
+
+    def wait(self, game_id: int | None, after_move_id: int, version: int | None = None):
+        self._wake.wait(self.interval)
+        self._wake.clear()
+
+    def report(self, changed: bool):
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.factor)
+
+    def notify_local_move(self):
+        # Ответ соперника ждём в ближайшие секунды: опрашиваем часто и прерываем текущую паузу
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def close(self):
+        self._wake.set()
+
+
+class LongPollChannel(UpdateChannel):
+    """Сервер держит запрос /wait_game_update, пока в игре не появится что-то новое."""
+
+    def __init__(self, transport: Transport, hold: float = LONG_POLL_HOLD):
+        self.transport = transport
+        self.hold = hold
+        self.fallback = AdaptivePollChannel()
+        self.supported = True
+        connect_timeout = transport.timeouts.get("get_game_info", (1.0, 3.0))[0]
+        transport.timeouts.setdefault("wait_game_update", (connect_timeout, hold + 5.0))
+
+    def wait(self, game_id: int | None, after_move_id: int, version: int | None = None):
+        # Без версии сервер не заметит смену заголовков игры (например, вход второго игрока),
+        # и запрос провисит весь hold: пока версия неизвестна, опрашиваем обычным способом
+        if game_id is None or version is None or not self.supported:
+            self.fallback.wait(game_id, after_move_id, version)
+            return
+        try:
+            params = {"game_id": game_id, "after_move_id": after_move_id, "version": version, "timeout": self.hold}
+            http_response = self.transport.request("wait_game_update", params)
+            if http_response.status_code == 404:
+                logging.info("Сервер не поддерживает long-poll, переключаюсь на адаптивный опрос")
+                self.supported = False
+            elif http_response.status_code != 200 or http_response.json()["status"] != 200:
+                # Сервер отвечает ошибкой сразу: без паузы цикл опроса завалит его запросами
+                logging.warning(f"Ошибка long-poll (HTTP {http_response.status_code}), жду как при обычном опросе")
+                self.fallback.wait(game_id, after_move_id, version)
+        except Exception as e:
+            logging.error(f"Исключение при ожидании обновлений: {e}")
+            self.fallback.wait(game_id, after_move_id, version)
+
+    def report(self, changed: bool):
+        self.fallback.report(changed)
+
+    def notify_local_move(self):
+        self.fallback.notify_local_move()
+
+    def close(self):
+        self.fallback.close()
+
+
+class SseChannel(UpdateChannel):
+    """Поток server-sent events /game_events: фоновый поток читает события, wait() ждёт ближайшее."""
+
+    def __init__(self, transport: Transport, heartbeat: float = SSE_HEARTBEAT):
+        self.transport = transport
+        self.heartbeat = heartbeat
+        self.fallback = AdaptivePollChannel()
+        self.supported = True
+        self._event = threading.Event()
+        self._game_id = None
+        self._reader = None
+        self._closed = False
+
+    def wait(self, game_id: int | None, after_move_id: int, version: int | None = None):
+        if game_id is None or not self.supported:
+            self.fallback.wait(game_id, after_move_id, version)
+            return
+        if game_id != self._game_id or self._reader is None or not self._reader.is_alive():
+            if self._reader is not None and game_id == self._game_id:
+                # Поток оборвался: переподключаемся не чаще, чем шёл бы адаптивный опрос
+                self.fallback.wait(game_id, after_move_id, version)
+            self._subscribe(game_id)
+        if self._event.wait(self.heartbeat):
+            self._event.clear()
+
+    def _subscribe(self, game_id: int):
+        self._game_id = game_id
+        # Первый запрос после подписки делаем сразу: события до подписки могли быть пропущены
+        self._event.set()
+        self._reader = threading.Thread(target=self._read_events, args=(game_id,), daemon=True)
+        self._reader.start()
+
+    def _read_events(self, game_id: int):
+        connect_timeout = self.transport.timeouts.get("get_game_info", (1.0, 3.0))[0]
+        try:
+            stream = self.transport.session.get(f"{self.transport.host}/game_events", params={"game_id": game_id},
+                                                stream=True, timeout=(connect_timeout, self.heartbeat * 2))
+            if stream.status_code == 404:
+                logging.info("Сервер не поддерживает SSE, переключаюсь на адаптивный опрос")
+                self.supported = False
+                self._event.set()
+                return
+            # chunk_size=1: события короткие, и ждать заполнения буфера нельзя
+            with stream:
+                for line in stream.iter_lines(chunk_size=1, decode_unicode=True):
+                    # Отписка проверяется на каждой строке, в том числе на пингах сервера
+                    if self._closed or game_id != self._game_id:
+                        break
+                    if line and line.startswith("data:"):
+                        payload = json.loads(line[5:].strip() or "{}")
+                        logging.debug(f"SSE событие игры {game_id}: {payload}")
+                        self._event.set()
+        except (requests.RequestException, ValueError) as e:
+            if not self._closed:
+                logging.error(f"Исключение в потоке SSE: {e}")
+        finally:
+            # Поток закрылся — будим ожидающего, следующий wait() переподпишется
+            self._event.set()
+
+    def report(self, changed: bool):
+        self.fallback.report(changed)
+
+    def notify_local_move(self):
+        self.fallback.notify_local_move()
+        self._event.set()
+
+    def close(self):
+        # Поток чтения сам закроет соединение на ближайшем событии или пинге
+        self._closed = True
+        self._event.set()
+        self.fallback.close()
+
+
+def make_update_channel(kind: str, transport: Transport) -> UpdateChannel:
+    if kind == "poll":
+        return AdaptivePollChannel()
+    if kind == "long_poll":
+        return LongPollChannel(transport)
+    if kind == "sse":
+        return SseChannel(transport)
+    raise ValueError(f"Неизвестный тип канала обновлений: {kind}")